@@ -0,0 +1,230 @@
+"""
+Benchmarks for the hot paths of chip-parameter.py
+
+Each case records wall time (median of --repeat samples, each sample running the case
+enough times to last at least --min-time), peak traced memory and points per second.
+Results can be saved as a baseline and later runs compared against it:
+
+    python benchmarks/benchmark_optimizer.py --save-baseline
+    python benchmarks/benchmark_optimizer.py --compare
+    python benchmarks/benchmark_optimizer.py --only analyze_a_range --scale small
+
+--module benchmarks another copy of chip-parameter.py, e.g. the original script
+(baseline_24421b4.json); cases it does not support are skipped.
+"""
+import argparse
+import contextlib
+import importlib.util
+import inspect
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+MODULE_PATH = os.path.join(HERE, '..', 'chip-parameter.py')
+
+def load_optimizer_module(path=MODULE_PATH):
+    """Import chip-parameter.py (not importable by name because of the hyphen)"""
+    spec = importlib.util.spec_from_file_location('chip_parameter', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['chip_parameter'] = module
+    spec.loader.exec_module(module)
+    return module
+
+# Grid sizes per scale: (n_a, n_b); production matches find_all_feasible_solutions
+SCALES = {
+    'small': (5, 8),
+    'medium': (20, 30),
+    'production': (30, 40)
+}
+
+def build_cases(module, scales):
+    """Return list of (name, scale, setup) where setup() gives (run, n_points)"""
+    cases = []
+    
+    def scalar_calls(n_calls):
+        def setup():
+            optimizer = module.EnhancedIonTrapOptimizer()
+            def run():
+                for i in range(n_calls):
+                    a_prime = 50 + (i % 20)
+                    optimizer.calculate_trap_depth(a_prime, 120.0, 150.0, 25.0)
+                    optimizer.calculate_q_parameter(a_prime, 120.0, 150.0, 25.0)
+                    optimizer.calculate_secular_frequency(a_prime, 120.0, 150.0, 25.0)
+            return run, n_calls
+        return setup
+    
+    def required_vrf(n_geometries):
+        def setup():
+            optimizer = module.EnhancedIonTrapOptimizer()
+            def run():
+                for i in range(n_geometries):
+                    optimizer.find_required_vrf_for_secular_freq(50 + i % 20, 80 + i % 70, 2.5)
+            return run, n_geometries * 100
+        return setup
+    
+    def grid_method(method, n_a, n_b, **kwargs):
+        def setup():
+            optimizer = module.EnhancedIonTrapOptimizer()
+            def run():
+                getattr(optimizer, method)(a_range=(50, 75), n_a=n_a, n_b=n_b, **kwargs)
+            return run, n_a * n_b * 100
+        return setup
+    
+    def feasible_search(n_a, n_b, **kwargs):
+        def setup():
+            optimizer = module.EnhancedIonTrapOptimizer()
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    optimizer.find_all_feasible_solutions(n_a=n_a, n_b=n_b, **kwargs)
+            return run, n_a * n_b * 100
+        return setup
+    
+    def plotting(max_points):
+        def setup():
+            optimizer = module.EnhancedIonTrapOptimizer()
+            output = os.path.join(tempfile.mkdtemp(), 'benchmark.png')
+            if 'output' in inspect.signature(optimizer.visualize_comprehensive_analysis).parameters:
+                def run():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        optimizer.visualize_comprehensive_analysis(output=output, max_points=max_points)
+            else:
+                # Versions without output= draw on pyplot; save so the figure is rendered
+                import matplotlib.pyplot as plt
+                def run():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        optimizer.visualize_comprehensive_analysis()
+                    plt.gcf().savefig(output)
+                    plt.close('all')
+            return run, 20 * 30 * 100 + 50 * 100
+        return setup
+    
+    cases.append(('scalar_calls', 'small', scalar_calls(1000)))
+    cases.append(('scalar_calls', 'medium', scalar_calls(10000)))
+    cases.append(('find_required_vrf', 'small', required_vrf(20)))
+    cases.append(('find_required_vrf', 'medium', required_vrf(200)))
+    for scale in scales:
+        n_a, n_b = SCALES[scale]
+        cases.append(('analyze_a_range', scale, grid_method('analyze_a_range', n_a, n_b)))
+        cases.append(('sweep_a_range', scale, grid_method('sweep_a_range', n_a, n_b)))
+        cases.append(('find_all_feasible', scale, feasible_search(n_a, n_b)))
+        cases.append(('find_all_feasible_streaming', scale, feasible_search(n_a, n_b, streaming=True, keep_all=False)))
+    cases.append(('sweep_a_range', 'large', grid_method('sweep_a_range', 300, 400)))
+    cases.append(('sweep_a_range_workers4', 'large', grid_method('sweep_a_range', 300, 400, workers=4)))
+    cases.append(('visualize', 'medium', plotting(20000)))
+    cases.append(('visualize_vector', 'medium', plotting(10**9)))
+    
+    return [case for case in cases if case[1] in scales or case[1] == 'large' and 'production' in scales]
+
+def measure(setup, repeat, min_time):
+    """Median wall time over repeat samples of at least min_time each, then one traced run for peak memory"""
+    run, n_points = setup()
+    warm_up = _timed(run)
+    
+    # Short cases run several times per sample; slow cases (plotting) get a single sample
+    number = max(1, math.ceil(min_time / max(warm_up, 1e-9)))
+    samples = [_timed(run, number) / number for _ in range(1 if warm_up > 1.0 else repeat)]
+    wall = statistics.median(samples)
+    
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'wall_s': wall,
+        'wall_min_s': min(samples),
+        'runs_per_sample': number,
+        'samples': len(samples),
+        'peak_mib': peak / 2**20,
+        'points': n_points,
+        'points_per_s': n_points / wall if wall > 0 else float('inf')
+    }
+
+def _timed(run, number=1):
+    start = time.perf_counter()
+    for _ in range(number):
+        run()
+    return time.perf_counter() - start
+
+def compare(results, baseline, tolerance):
+    """Print time ratios against the baseline, return names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':45s} {'baseline':>10s} {'current':>10s} {'ratio':>7s}")
+    for key, result in results.items():
+        if key not in baseline:
+            print(f"{key:45s} {'-':>10s} {result['wall_s']:10.4f} {'new':>7s}")
+            continue
+        ratio = result['wall_s'] / baseline[key]['wall_s']
+        flag = ' REGRESSION' if ratio > tolerance else ''
+        print(f"{key:45s} {baseline[key]['wall_s']:10.4f} {result['wall_s']:10.4f} {ratio:7.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=list(SCALES))
+    parser.add_argument('--only', nargs='+', default=None, help="run only these case names")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per case (median is reported)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="minimum seconds per sample")
+    parser.add_argument('--module', default=MODULE_PATH, help="chip-parameter.py to benchmark")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=1.25, help="allowed slowdown ratio before failing")
+    parser.add_argument('--json', default=None, help="also write results to this path")
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    module = load_optimizer_module(args.module)
+    
+    results = {}
+    for name, scale, setup in build_cases(module, args.scale):
+        if args.only and name not in args.only:
+            continue
+        key = f"{name}[{scale}]"
+        try:
+            results[key] = measure(setup, args.repeat, args.min_time)
+        except (AttributeError, TypeError) as error:
+            # Older versions of the script lack some methods and keyword arguments
+            if args.module == MODULE_PATH:
+                raise
+            print(f"{key:45s} skipped: {error}")
+            continue
+        r = results[key]
+        print(f"{key:45s} {r['wall_s']:9.4f} s {r['peak_mib']:9.1f} MiB {r['points_per_s']:14.0f} pts/s")
+    
+    report = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'module': os.path.basename(args.module),
+        'results': results
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    status = 0
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        status = 1 if compare(results, baseline, args.tolerance) else 0
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,16 @@
+import argparse
+import copy
+import heapq
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from mpl_toolkits.mplot3d import Axes3D
-import pandas as pd
-from scipy.optimize import minimize_scalar
+
+# matplotlib, pandas and the process pool are imported where they are used so that
+# numeric command-line queries start fast
 
 # Physical constants
 q_e = 1.60217646e-19    # electron charge (C)
@@ -16,11 +23,454 @@ N_ion = 171  # Yb-171
 Z_ion = 1
 m_ion = N_ion * m_p  # ion mass (kg)
 
+# Common species: name -> (mass number, charge)
+ION_SPECIES = {
+    'Yb-171': (171, 1),
+    'Yb-174': (174, 1),
+    'Ca-40': (40, 1),
+    'Ca-43': (43, 1),
+    'Be-9': (9, 1),
+    'Ba-137': (137, 1),
+    'Ba-138': (138, 1),
+    'Sr-88': (88, 1),
+    'Mg-24': (24, 1)
+}
+
 # Units
 MHz = 1e6
 meV = 1e-3
 um = 1e6
 
+# Threshold fields of target_specs, in the column order used by spec batches
+SPEC_KEYS = ('secular_freq', 'q_max', 'V_rf_max', 'depth_min', 'depth_max')
+
+# Columns produced by the vectorized sweep engine (same keys as the result dicts)
+RESULT_COLUMNS = ('a_prime', 'b_prime', 'height', 'F_rf', 'V_rf_required', 'q', 'depth',
+                  'meets_criteria', 'V_rf_feasible', 'q_feasible', 'depth_feasible')
+
+def columns_to_records(columns):
+    """Convert sweep column arrays into the list-of-dicts result format"""
+    values = [columns[key].tolist() for key in RESULT_COLUMNS]
+    
+    # A dict display per row is about twice as fast as dict(zip(RESULT_COLUMNS, row))
+    return [
+        {'a_prime': a_prime, 'b_prime': b_prime, 'height': height, 'F_rf': F_rf, 'V_rf_required': V_rf_required,
+         'q': q, 'depth': depth, 'meets_criteria': meets_criteria, 'V_rf_feasible': V_rf_feasible,
+         'q_feasible': q_feasible, 'depth_feasible': depth_feasible}
+        for (a_prime, b_prime, height, F_rf, V_rf_required, q, depth,
+             meets_criteria, V_rf_feasible, q_feasible, depth_feasible) in zip(*values)
+    ]
+
+# Default Pareto objectives: column -> 'min' or 'max'
+PARETO_OBJECTIVES = {'V_rf_required': 'min', 'depth': 'max', 'q': 'min', 'height': 'max'}
+
+def pareto_front_indices(values, block_size=512):
+    """
+    Indices of the non-dominated rows of an (n, k) array, all objectives minimized
+    Rows are sorted lexicographically first, so a row can only be dominated by rows
+    before it; two objectives then reduce to a running minimum, O(n log n). Three or
+    more objectives take O(n * front size) comparisons: rows are processed in blocks of
+    block_size, each checked at once against the front found so far and against the
+    earlier rows of its own block. Duplicate rows keep the first.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.zeros(0, dtype=int)
+    
+    order = np.lexsort(values.T[::-1])
+    ranked = values[order]
+    
+    if values.shape[1] == 1:
+        return order[:1]
+    
+    if values.shape[1] == 2:
+        previous_best = np.concatenate(([np.inf], np.minimum.accumulate(ranked[:-1, 1])))
+        return order[ranked[:, 1] < previous_best]
+    
+    def dominated(earlier, rows):
+        """dominated[i, j]: earlier row i is <= rows[j] in every objective"""
+        result = earlier[:, None, 0] <= rows[None, :, 0]
+        for column in range(1, rows.shape[1]):
+            result &= earlier[:, None, column] <= rows[None, :, column]
+        return result
+    
+    # Weak dominance is transitive, so checking against the front (plus the current
+    # block) is the same as checking against every earlier row
+    front = np.empty_like(ranked)
+    n_front = 0
+    keep = []
+    for start in range(0, len(ranked), block_size):
+        rows = ranked[start:start + block_size]
+        survives = ~np.triu(dominated(rows, rows), 1).any(axis=0)
+        for front_start in range(0, n_front, block_size):
+            candidates = np.flatnonzero(survives)
+            if len(candidates) == 0:
+                break
+            hit = dominated(front[front_start:min(front_start + block_size, n_front)], rows[candidates]).any(axis=0)
+            survives[candidates[hit]] = False
+        
+        new = np.flatnonzero(survives)
+        front[n_front:n_front + len(new)] = rows[new]
+        n_front += len(new)
+        keep.append(start + new)
+    
+    return order[np.concatenate(keep)]
+
+# Boolean columns of RESULT_COLUMNS, stored bit-packed by write_sweep_store
+FLAG_COLUMNS = ('meets_criteria', 'V_rf_feasible', 'q_feasible', 'depth_feasible')
+
+# Default 1-sigma tolerances for tolerance_analysis: a', b' in um, V_rf and F_rf relative,
+# correction absolute (the slot correction factor in the ion height)
+DEFAULT_TOLERANCES = {'a_prime': 0.5, 'b_prime': 0.5, 'V_rf': 0.01, 'F_rf': 0.001, 'correction': 0.01}
+
+# Summary statistics reported per sampled quantity by tolerance_analysis
+TOLERANCE_QUANTITIES = ('height', 'q', 'depth', 'secular_freq')
+
+class SweepProfiler:
+    """
+    Per-stage timers, counters and memory high-water marks for sweeps and plotting
+    Attach with optimizer.profiler = SweepProfiler(); read back with report() or to_json().
+    trace_memory=True also records the tracemalloc peak per stage (slower); tracing is
+    only on while a stage runs, unless it was already started outside the profiler.
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.counters = {}
+        # Peak traced bytes of the stages currently open, innermost last
+        self._peaks = []
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a block and accumulate it under name"""
+        if self.trace_memory:
+            import tracemalloc
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            # reset_peak() below would hide the enclosing stage's peak so far, so keep it
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.record(name, time.perf_counter() - start)
+            if self.trace_memory:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                entry['peak_traced_mib'] = max(entry.get('peak_traced_mib', 0.0), peak / 2**20)
+                if started:
+                    tracemalloc.stop()
+    
+    def record(self, name, seconds):
+        """Add an externally timed interval to stage name"""
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        return entry
+    
+    def count(self, name, n=1):
+        """Add n to counter name"""
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+    
+    def merge_stages(self, stages):
+        """Add the stage entries of another profiler (e.g. from a worker process)"""
+        for name, other in stages.items():
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += other['seconds']
+            entry['calls'] += other['calls']
+    
+    def report(self):
+        """Structured summary: stages, counters and process memory high-water mark"""
+        report = {
+            'stages': {name: dict(entry) for name, entry in self.stages.items()},
+            'counters': dict(self.counters),
+            'total_seconds': sum(entry['seconds'] for entry in self.stages.values())
+        }
+        try:
+            import resource
+            # ru_maxrss is in KiB on Linux
+            report['max_rss_mib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            pass
+        return report
+    
+    def to_json(self, **kwargs):
+        """report() as a JSON string"""
+        return json.dumps(self.report(), **kwargs)
+    
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+
+class _NullProfiler:
+    """Disabled profiler: stage() and count() do nothing"""
+    _context = nullcontext()
+    
+    def stage(self, name):
+        return self._context
+    
+    def record(self, name, seconds):
+        pass
+    
+    def count(self, name, n=1):
+        pass
+    
+    def merge_stages(self, stages):
+        pass
+
+NULL_PROFILER = _NullProfiler()
+
+# Physics columns of a sweep; the feasibility flags are derived from these and target_specs
+PHYSICS_COLUMNS = ('a_prime', 'b_prime', 'height', 'F_rf', 'V_rf_required', 'q', 'depth')
+
+class SweepResult:
+    """
+    Sweep output with feasibility derived lazily from the current target_specs
+    Physics columns are kept as computed, with a sorted index on V_rf_required, q and
+    depth. Changing q_max, V_rf_max, depth_min or depth_max only invalidates the derived
+    flags; per-constraint counts come from binary searches on the sorted indexes.
+    Changing secular_freq rescales q and V_rf linearly and the depth quadratically, which
+    keeps every sort order, so it is handled by rescaling the thresholds instead.
+    Feasible points are found from the most selective constraint's index range, so the
+    cost follows the size of that range rather than the size of the sweep; query() does
+    the same for arbitrary column ranges and nearest() uses a k-d tree.
+    """
+    SCALING = {'V_rf_required': 1, 'q': 1, 'depth': 2}
+    
+    def __init__(self, columns, target_specs):
+        self._columns = {key: np.asarray(columns[key]) for key in PHYSICS_COLUMNS}
+        self._sweep_sec_freq = float(target_specs['secular_freq'])
+        self._specs = dict(target_specs)
+        self._order = {}
+        self._sorted = {}
+        self._flags = None
+        self._feasible = None
+        self._trees = {}
+    
+    def __len__(self):
+        return len(self._columns['a_prime'])
+    
+    def __getitem__(self, name):
+        return self.column(name)
+    
+    @property
+    def target_specs(self):
+        return dict(self._specs)
+    
+    def update_specs(self, **changes):
+        """Change threshold specs (and/or secular_freq); derived results are recomputed on demand"""
+        unknown = set(changes) - set(SPEC_KEYS)
+        if unknown:
+            raise KeyError(f"unknown target_specs keys: {sorted(unknown)}")
+        self._specs.update(changes)
+        self._flags = None
+        self._feasible = None
+        return self
+    
+    def _scale(self, name):
+        """Factor from the swept secular frequency to the current one for a physics column"""
+        return (self._specs['secular_freq'] / self._sweep_sec_freq)**self.SCALING.get(name, 0)
+    
+    def _sorted_column(self, name):
+        """Stable sort order and sorted values of an unscaled physics column"""
+        if name not in self._order:
+            order = np.argsort(self._columns[name], kind='stable')
+            self._order[name] = order
+            self._sorted[name] = self._columns[name][order]
+        return self._order[name], self._sorted[name]
+    
+    def _index_range(self, name, low=-np.inf, high=np.inf):
+        """Positions [start, stop) in the sorted index with low <= column <= high (current units)"""
+        _, values = self._sorted_column(name)
+        scale = self._scale(name)
+        return int(np.searchsorted(values, low / scale, side='left')), int(np.searchsorted(values, high / scale, side='right'))
+    
+    def _select(self, ranges):
+        """
+        Sorted row indices with low <= column <= high for every name: (low, high) in ranges
+        Gathers the rows of the narrowest index range and checks the others on that subset.
+        """
+        positions = {name: self._index_range(name, low, high) for name, (low, high) in ranges.items()}
+        if not positions:
+            return np.arange(len(self))
+        name = min(positions, key=lambda key: positions[key][1] - positions[key][0])
+        start, stop = positions[name]
+        index = self._sorted_column(name)[0][start:stop]
+        
+        ok = np.ones(len(index), dtype=bool)
+        for other, (other_start, other_stop) in positions.items():
+            if other != name:
+                # Compare against the bounding sorted values so the result matches the index range exactly
+                _, values = self._sorted_column(other)
+                lower = values[other_start] if other_start < len(values) else np.inf
+                upper = values[other_stop - 1] if other_stop > 0 else -np.inf
+                column = self._columns[other][index]
+                ok &= (lower <= column) & (column <= upper)
+        return np.sort(index[ok])
+    
+    def _constraint_ranges(self):
+        specs = self._specs
+        return {
+            'V_rf_required': self._index_range('V_rf_required', high=specs['V_rf_max']),
+            'q': self._index_range('q', high=specs['q_max']),
+            'depth': self._index_range('depth', specs['depth_min'], specs['depth_max'])
+        }
+    
+    def feasible_index(self):
+        """Sorted row indices meeting all specs (cached until the specs change)"""
+        if self._feasible is None:
+            ranges = self._constraint_ranges()
+            name = min(ranges, key=lambda key: ranges[key][1] - ranges[key][0])
+            start, stop = ranges[name]
+            if 8 * (stop - start) > len(self):
+                # Gathering a large share of rows is slower than one sequential pass
+                self._feasible = np.flatnonzero(self.flags()['meets_criteria'])
+                return self._feasible
+            specs = self._specs
+            self._feasible = self._select({
+                'V_rf_required': (-np.inf, specs['V_rf_max']),
+                'q': (-np.inf, specs['q_max']),
+                'depth': (specs['depth_min'], specs['depth_max'])
+            })
+        return self._feasible
+    
+    def column(self, name):
+        """Physics column in current units, or a feasibility flag"""
+        if name in self._columns:
+            scale = self._scale(name)
+            return self._columns[name] if scale == 1 else self._columns[name] * scale
+        return self.flags()[name]
+    
+    def flags(self):
+        """meets_criteria and per-constraint flags for the current specs (cached)"""
+        if self._flags is None:
+            specs = self._specs
+            V_rf_feasible = self._columns['V_rf_required'] <= specs['V_rf_max'] / self._scale('V_rf_required')
+            q_feasible = self._columns['q'] <= specs['q_max'] / self._scale('q')
+            depth = self._columns['depth']
+            depth_scale = self._scale('depth')
+            depth_feasible = (specs['depth_min'] / depth_scale <= depth) & (depth <= specs['depth_max'] / depth_scale)
+            self._flags = {
+                'meets_criteria': q_feasible & V_rf_feasible & depth_feasible,
+                'V_rf_feasible': V_rf_feasible,
+                'q_feasible': q_feasible,
+                'depth_feasible': depth_feasible
+            }
+        return self._flags
+    
+    def counts(self):
+        """Point counts per constraint (binary searches) and overall"""
+        ranges = self._constraint_ranges()
+        return {
+            'n_points': len(self),
+            'n_feasible': len(self.feasible_index()),
+            'n_V_rf_feasible': ranges['V_rf_required'][1] - ranges['V_rf_required'][0],
+            'n_q_feasible': ranges['q'][1] - ranges['q'][0],
+            'n_depth_feasible': ranges['depth'][1] - ranges['depth'][0]
+        }
+    
+    def best(self, k=10):
+        """The k feasible points with the lowest V_rf, in sweep order among equal V_rf"""
+        if k <= 0:
+            return []
+        index = self.feasible_index()
+        V_rf = self._columns['V_rf_required'][index]
+        if len(index) > k:
+            # Keep only candidates at or below the k-th smallest V_rf before the full sort
+            index = index[V_rf <= np.partition(V_rf, k - 1)[k - 1]]
+            V_rf = self._columns['V_rf_required'][index]
+        best = index[np.lexsort((index, V_rf))][:k]
+        
+        return self.records(best)
+    
+    def query_index(self, feasible_only=False, **ranges):
+        """
+        Sorted row indices matching inclusive column ranges, e.g. height=(60, 70), V_rf_required=(None, 200)
+        A None bound is open. Cost is one binary search per column plus the rows of the narrowest range.
+        """
+        bounds = {}
+        for name, (low, high) in ranges.items():
+            if name not in PHYSICS_COLUMNS:
+                raise KeyError(f"unknown column: {name}")
+            bounds[name] = (-np.inf if low is None else low, np.inf if high is None else high)
+        index = self._select(bounds)
+        if feasible_only:
+            index = index[np.isin(index, self.feasible_index(), assume_unique=True)]
+        return index
+    
+    def query(self, feasible_only=False, **ranges):
+        """Rows matching inclusive column ranges (see query_index), as result dicts"""
+        return self.records(self.query_index(feasible_only, **ranges))
+    
+    def _tree(self, names):
+        """k-d tree over unscaled columns divided by their spans, built on first use"""
+        if names not in self._trees:
+            spans = []
+            for name in names:
+                _, values = self._sorted_column(name)
+                spans.append(float(values[-1] - values[0]) or 1.0)
+            spans = np.array(spans)
+            points = np.column_stack([self._columns[name] for name in names]) / spans
+            
+            try:
+                from scipy.spatial import cKDTree
+                tree = cKDTree(points)
+            except ImportError:
+                tree = None
+            self._trees[names] = (tree, points, spans)
+        return self._trees[names]
+    
+    def nearest_index(self, target, k=1, feasible_only=False):
+        """
+        Row indices of the k points closest to target, a dict such as {'height': 65, 'F_rf': 25}
+        Distances are measured with each column divided by its span over the sweep; the
+        spans scale with secular_freq exactly like the columns, so the tree is reused across
+        spec changes. With feasible_only, or without scipy, the candidates are scanned directly.
+        """
+        names = tuple(name for name in PHYSICS_COLUMNS if name in target)
+        if len(names) != len(target):
+            raise KeyError(f"unknown columns: {sorted(set(target) - set(names))}")
+        if k <= 0:
+            return np.zeros(0, dtype=int)
+        tree, points, spans = self._tree(names)
+        point = np.array([target[name] / self._scale(name) for name in names]) / spans
+        
+        if feasible_only:
+            # Scan only the feasible subset, which is usually far smaller than the sweep
+            candidates = self.feasible_index()
+            distance = np.sum((points[candidates] - point)**2, axis=1)
+        elif tree is not None:
+            _, index = tree.query(point, k=min(k, len(self)))
+            return np.atleast_1d(index)
+        else:
+            candidates = np.arange(len(self))
+            distance = np.sum((points - point)**2, axis=1)
+        
+        if k < len(candidates):
+            keep = np.argpartition(distance, k - 1)[:k]
+            candidates, distance = candidates[keep], distance[keep]
+        return candidates[np.lexsort((candidates, distance))]
+    
+    def nearest(self, target, k=1, feasible_only=False):
+        """The k points closest to target (see nearest_index), as result dicts"""
+        return self.records(self.nearest_index(target, k, feasible_only))
+    
+    def to_columns(self, index=None):
+        """Dict of RESULT_COLUMNS arrays in current units, optionally for a subset of rows"""
+        columns = {key: self.column(key) for key in RESULT_COLUMNS}
+        if index is not None:
+            columns = {key: value[index] for key, value in columns.items()}
+        return columns
+    
+    def records(self, index=None):
+        """Rows as result dicts"""
+        return columns_to_records(self.to_columns(index))
+
 class EnhancedIonTrapOptimizer:
     def __init__(self, ion_mass_number=171, ion_charge=1):
         """
@@ -39,21 +489,44 @@ class EnhancedIonTrapOptimizer:
             'depth_max': 0.1          # eV, maximum trap depth
         }
         
+        # Slot correction factor in the ion height, height = correction * sqrt(a'b')
+        self.height_correction = 0.95
+        
+        # Instrumentation, replace with a SweepProfiler to collect stage timings
+        self.profiler = NULL_PROFILER
+        
+    def geometry_factors(self, a_prime, b_prime):
+        """
+        Geometry-only factors shared by the q, V_rf and depth formulas
+        Returns (geometric_factor, g_factor): geometric_factor is the q-parameter factor
+        8(b'-a')/(pi sqrt(a'b') (a'+b')^2) including the um^2 correction, g_factor the
+        trap depth factor. Works on scalars and arrays; sweeps evaluate it once per geometry.
+        """
+        return self._q_geometric_factor(a_prime, b_prime), self._depth_g_factor(a_prime, b_prime)
+    
+    def _q_geometric_factor(self, a_prime, b_prime):
+        return (8 * (b_prime - a_prime)) / (np.pi * np.sqrt(a_prime * b_prime) * (a_prime + b_prime)**2) * (um**2)
+    
+    def _depth_g_factor(self, a_prime, b_prime):
+        # Convert from old notation: a = 2*a_prime, b = b_prime - a_prime
+        a = 2 * a_prime
+        b = b_prime - a_prime
+        return (b / ((a + b)**2 + (a + b) * np.sqrt(2*a*b + a**2)))**2
+    
     def calculate_trap_height(self, a_prime, b_prime):
         """Calculate trap height"""
-        return 0.95 * np.sqrt(a_prime * b_prime)
+        return self.height_correction * np.sqrt(a_prime * b_prime)
     
     def calculate_trap_depth(self, a_prime, b_prime, V_rf, F_rf):
         """Calculate trap depth in eV"""
+        return self._trap_depth_from_factor(self._depth_g_factor(a_prime, b_prime), V_rf, F_rf)
+    
+    def _trap_depth_from_factor(self, g_factor, V_rf, F_rf):
+        """Trap depth in eV from a precomputed g_factor"""
         omega_rf = 2 * np.pi * F_rf * MHz
         
-        # Convert from old notation: a = 2*a_prime, b = b_prime - a_prime
-        a = 2 * a_prime
-        b = b_prime - a_prime
-        
         # From paste.txt formula
         e_factor = (self.Z_ion * q_e * V_rf)**2 / ((np.pi**2) * self.m_ion * (omega_rf**2))
-        g_factor = (b / ((a + b)**2 + (a + b) * np.sqrt(2*a*b + a**2)))**2
         
         # Convert to eV and correct for um units
         depth = e_factor * g_factor * (um**2) * J_eV
@@ -64,12 +537,8 @@ class EnhancedIonTrapOptimizer:
         """Calculate Mathieu q parameter"""
         omega_rf = 2 * np.pi * F_rf * MHz
         
-        # Using the formula from ab_calc.py (already in a', b' notation)
-        q_val = (q_e * V_rf) / (self.m_ion * omega_rf**2) * \
-                (8 * (b_prime - a_prime)) / (np.pi * np.sqrt(a_prime * b_prime) * (a_prime + b_prime)**2)
-        
-        # Apply um^2 correction
-        q_val = abs(q_val * (um**2))
+        # Using the formula from ab_calc.py (already in a', b' notation, um^2 corrected)
+        q_val = abs((self.Z_ion * q_e * V_rf) / (self.m_ion * omega_rf**2) * self._q_geometric_factor(a_prime, b_prime))
         
         return q_val
     
@@ -92,6 +561,9 @@ class EnhancedIonTrapOptimizer:
         F_rf_values = np.linspace(F_rf_range[0], F_rf_range[1], 100)
         solutions = []
         
+        # q = (Z_ion * q_e * V_rf) / (m_ion * omega_rf^2) * geometric_factor
+        geometric_factor = self._q_geometric_factor(a_prime, b_prime)
+        
         for F_rf in F_rf_values:
             # For target secular frequency, solve for required q
             omega_rf = 2 * np.pi * F_rf * MHz
@@ -99,10 +571,7 @@ class EnhancedIonTrapOptimizer:
             q_required = 2 * np.sqrt(2) * omega_sec_target / omega_rf
             
             # Solve for V_rf from q formula
-            # q = (q_e * V_rf) / (m_ion * omega_rf^2) * geometric_factor
-            geometric_factor = (8 * (b_prime - a_prime)) / (np.pi * np.sqrt(a_prime * b_prime) * (a_prime + b_prime)**2) * (um**2)
-            
-            V_rf_required = q_required * self.m_ion * omega_rf**2 / (q_e * geometric_factor)
+            V_rf_required = q_required * self.m_ion * omega_rf**2 / (self.Z_ion * q_e * geometric_factor)
             
             solutions.append({
                 'F_rf': F_rf,
@@ -112,107 +581,885 @@ class EnhancedIonTrapOptimizer:
         
         return solutions
     
-    def analyze_a70_limitations(self, b_prime_range=(80, 150), n_points=50):
+    def required_vrf_array(self, a_prime, b_prime, target_sec_freq, F_rf):
         """
-        Analyze limitations when a'=70
+        Vectorized form of find_required_vrf_for_secular_freq
+        Broadcasts over a_prime, b_prime and F_rf; returns (V_rf_required, q_required) arrays
         """
-        a_prime = 70
-        b_prime_values = np.linspace(b_prime_range[0], b_prime_range[1], n_points)
+        geometric_factor = self._q_geometric_factor(a_prime, b_prime)
+        
+        return self._required_vrf_from_factor(geometric_factor, target_sec_freq, F_rf)
+    
+    def _required_vrf_from_factor(self, geometric_factor, target_sec_freq, F_rf):
+        """(V_rf_required, q_required) from a precomputed geometric_factor"""
+        omega_rf = 2 * np.pi * F_rf * MHz
+        omega_sec_target = 2 * np.pi * target_sec_freq * MHz
+        q_required = 2 * np.sqrt(2) * omega_sec_target / omega_rf
+        
+        V_rf_required = q_required * self.m_ion * omega_rf**2 / (self.Z_ion * q_e * geometric_factor)
+        
+        return V_rf_required, q_required
+    
+    def feasibility_flags(self, V_rf_required, q, depth, target_specs=None):
+        """
+        Evaluate the target_specs thresholds on scalar or array inputs
+        Returns dict with meets_criteria, V_rf_feasible, q_feasible, depth_feasible
+        """
+        specs = self.target_specs if target_specs is None else target_specs
+        
+        V_rf_feasible = V_rf_required <= specs['V_rf_max']
+        q_feasible = q <= specs['q_max']
+        depth_feasible = (specs['depth_min'] <= depth) & (depth <= specs['depth_max'])
+        
+        return {
+            'meets_criteria': q_feasible & V_rf_feasible & depth_feasible,
+            'V_rf_feasible': V_rf_feasible,
+            'q_feasible': q_feasible,
+            'depth_feasible': depth_feasible
+        }
+    
+    def sweep_geometries(self, a_prime_values, b_prime_values, F_rf_range=(10, 50), n_F=100, workers=None,
+                         target_sec_freq=None, factors=None):
+        """
+        Vectorized sweep engine over a list of (a', b') geometries
+        a_prime_values and b_prime_values are paired 1D arrays (one entry per geometry).
+        The whole (geometry, F_rf) grid is evaluated in one pass; geometries with
+        b' <= a' and points with V_rf <= 0 are masked out.
+        workers > 1 shards the geometry list across a process pool (see sweep_parallel).
+        target_sec_freq defaults to target_specs['secular_freq']. factors optionally gives
+        precomputed (geometric_factor, g_factor) arrays paired with the geometries.
+        Returns: dict of column arrays (see RESULT_COLUMNS), geometry-major then F_rf
+        """
+        a_prime = np.asarray(a_prime_values, dtype=float).ravel()
+        b_prime = np.asarray(b_prime_values, dtype=float).ravel()
+        
+        if workers is not None and workers > 1:
+            return self.sweep_parallel(a_prime, b_prime, F_rf_range=F_rf_range, n_F=n_F, workers=workers,
+                                       target_sec_freq=target_sec_freq, factors=factors)
+        
+        if target_sec_freq is None:
+            target_sec_freq = self.target_specs['secular_freq']
+        
+        profiler = self.profiler
         
-        results = []
+        # Skip unrealistic geometries
+        valid = b_prime > a_prime
+        a_prime = a_prime[valid]
+        b_prime = b_prime[valid]
+        F_rf = np.linspace(F_rf_range[0], F_rf_range[1], n_F)[None, :]
         
-        for b_prime in b_prime_values:
+        # Geometry-only terms once per geometry, broadcast over F_rf
+        with profiler.stage('geometry'):
+            if factors is None:
+                geometric_factor, g_factor = self.geometry_factors(a_prime, b_prime)
+            else:
+                geometric_factor, g_factor = (np.asarray(factor, dtype=float).ravel()[valid] for factor in factors)
             height = self.calculate_trap_height(a_prime, b_prime)
-            
-            # Find required V_rf for target secular frequency
-            vrf_solutions = self.find_required_vrf_for_secular_freq(
-                a_prime, b_prime, self.target_specs['secular_freq']
+        
+        with profiler.stage('vrf_solve'):
+            V_rf_required, q_required = self._required_vrf_from_factor(
+                geometric_factor[:, None], target_sec_freq, F_rf
             )
+            shape = V_rf_required.shape
+            
+            # Only positive voltages
+            keep = V_rf_required > 0
+            
+            a_col = np.broadcast_to(a_prime[:, None], shape)[keep]
+            b_col = np.broadcast_to(b_prime[:, None], shape)[keep]
+            F_col = np.broadcast_to(F_rf, shape)[keep]
+            V_col = V_rf_required[keep]
+            q_col = np.broadcast_to(q_required, shape)[keep]
+        
+        with profiler.stage('depth'):
+            depth_col = self._trap_depth_from_factor(np.broadcast_to(g_factor[:, None], shape)[keep], V_col, F_col)
+        
+        columns = {
+            'a_prime': a_col,
+            'b_prime': b_col,
+            'height': np.broadcast_to(height[:, None], shape)[keep],
+            'F_rf': F_col,
+            'V_rf_required': V_col,
+            'q': q_col,
+            'depth': depth_col
+        }
+        with profiler.stage('feasibility'):
+            columns.update(self.feasibility_flags(V_col, q_col, depth_col))
+        
+        profiler.count('evaluations', V_rf_required.size)
+        profiler.count('points', len(V_col))
+        profiler.count('feasible', np.count_nonzero(columns['meets_criteria']))
+        
+        return columns
+    
+    def sweep_parallel(self, a_prime_values, b_prime_values, F_rf_range=(10, 50), n_F=100,
+                       workers=4, chunks_per_worker=4, target_sec_freq=None, factors=None, executor=None):
+        """
+        Process-pool version of sweep_geometries
+        The geometry list is split into contiguous chunks (a'-major for grid sweeps). The
+        output columns are preallocated in one memory-mapped file (in /dev/shm when it
+        has room, else the default temp directory) and each worker writes its chunk into
+        its own slice, so no result arrays travel back through pickle. Slice offsets follow
+        from the number of kept points per geometry, so the output is identical to the
+        serial sweep.
+        executor reuses an existing process pool instead of starting one per call.
+        With a profiler attached, workers time the same stages as the serial sweep and the
+        parent adds them up (summed over workers); 'pool_overhead' is the pool wall time
+        beyond the busiest worker's stages.
+        """
+        a_prime = np.asarray(a_prime_values, dtype=float).ravel()
+        b_prime = np.asarray(b_prime_values, dtype=float).ravel()
+        if target_sec_freq is None:
+            target_sec_freq = self.target_specs['secular_freq']
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # Kept points per geometry: b' > a' and V_rf > 0, where the sign of V_rf is the sign
+        # of the geometric factor times the sign of V_rf at geometric factor 1
+        if factors is None:
+            geometric_factor = self._q_geometric_factor(a_prime, b_prime)
+        else:
+            geometric_factor = np.asarray(factors[0], dtype=float).ravel()
+        V_unit, _ = self._required_vrf_from_factor(1.0, target_sec_freq, np.linspace(F_rf_range[0], F_rf_range[1], n_F))
+        usable = (b_prime > a_prime) & np.isfinite(geometric_factor)
+        points = np.where(usable & (geometric_factor > 0), np.count_nonzero(V_unit > 0),
+                          np.where(usable & (geometric_factor < 0), np.count_nonzero(V_unit < 0), 0))
+        
+        chunks = np.array_split(np.arange(len(a_prime)), workers * chunks_per_worker)
+        offsets = np.concatenate(([0], np.cumsum([points[chunk].sum() for chunk in chunks])))
+        n_points = int(offsets[-1])
+        if n_points == 0:
+            return self.sweep_geometries(a_prime[:0], b_prime[:0], F_rf_range=F_rf_range, n_F=n_F,
+                                         target_sec_freq=target_sec_freq)
+        
+        # Column layout in the shared file: float columns first, then the boolean flags
+        layout = []
+        position = 0
+        for key in RESULT_COLUMNS:
+            dtype = np.dtype(bool) if key in FLAG_COLUMNS else np.dtype(float)
+            layout.append((key, dtype.str, position))
+            position += dtype.itemsize * n_points
+        
+        # /dev/shm is often small in containers; fall back to the default temp directory
+        import tempfile
+        directory = None
+        if os.path.isdir('/dev/shm'):
+            stat = os.statvfs('/dev/shm')
+            if stat.f_bavail * stat.f_frsize >= position:
+                directory = '/dev/shm'
+        fd, path = tempfile.mkstemp(prefix='chip-sweep-', dir=directory)
+        try:
+            os.ftruncate(fd, position)
+            
+            # Workers get a copy with a fresh profiler whose stage times come back with the results
+            worker = copy.copy(self)
+            worker.profiler = NULL_PROFILER if self.profiler is NULL_PROFILER else SweepProfiler()
+            tasks = []
+            for chunk, start, stop in zip(chunks, offsets[:-1], offsets[1:]):
+                factor_chunk = None if factors is None else tuple(np.asarray(factor, dtype=float).ravel()[chunk]
+                                                                  for factor in factors)
+                tasks.append((worker, a_prime[chunk], b_prime[chunk], F_rf_range, n_F, target_sec_freq, factor_chunk,
+                              path, layout, int(start), int(stop)))
+            
+            pool_start = time.perf_counter()
+            pool = ProcessPoolExecutor(max_workers=workers) if executor is None else nullcontext(executor)
+            with pool as running:
+                results = list(running.map(_sweep_chunk, tasks))
+            pool_seconds = time.perf_counter() - pool_start
+            
+            # The mappings stay valid after the file is removed below
+            columns = {key: np.asarray(np.memmap(path, dtype=dtype, mode='r+', offset=offset, shape=(n_points,)))
+                       for key, dtype, offset in layout}
+        finally:
+            os.close(fd)
+            os.remove(path)
+        
+        busy = {}
+        for _, pid, stages in results:
+            self.profiler.merge_stages(stages)
+            busy[pid] = busy.get(pid, 0.0) + sum(entry['seconds'] for entry in stages.values())
+        self.profiler.record('pool_overhead', max(0.0, pool_seconds - max(busy.values())))
+        self.profiler.count('evaluations', np.count_nonzero(b_prime > a_prime) * n_F)
+        self.profiler.count('points', n_points)
+        self.profiler.count('feasible', np.count_nonzero(columns['meets_criteria']))
+        
+        return columns
+    
+    def sweep_a_range(self, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, workers=None,
+                      target_sec_freq=None):
+        """
+        Vectorized parameter space sweep over the a' x b' grid
+        Returns: dict of column arrays for all points (filter with columns['meets_criteria'])
+        """
+        a_prime_values = np.linspace(a_range[0], a_range[1], n_a)
+        b_prime_values = np.linspace(b_range[0], b_range[1], n_b)
+        a_grid, b_grid = np.meshgrid(a_prime_values, b_prime_values, indexing='ij')
+        
+        return self.sweep_geometries(a_grid, b_grid, workers=workers, target_sec_freq=target_sec_freq)
+    
+    def sweep_species(self, species, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, workers=None):
+        """
+        Sweep the a' x b' grid for several ion species at once
+        species is a list of names from ION_SPECIES or (mass number, charge) tuples.
+        The geometry, F_rf and q columns do not depend on the ion and are computed once;
+        V_rf_required scales with mass / charge, and the depth (charge^2 * V_rf^2 / mass)
+        then scales with the mass alone, so each species only rescales the shared columns
+        along an extra broadcast axis.
+        Returns: dict of column arrays, species-major, with 'species', 'ion_mass_number'
+        and 'ion_charge' tags added to RESULT_COLUMNS
+        """
+        names = []
+        mass_numbers = []
+        charges = []
+        for entry in species:
+            if isinstance(entry, str):
+                mass_number, charge = ION_SPECIES[entry]
+                names.append(entry)
+            else:
+                mass_number, charge = entry
+                names.append(f"{mass_number}+{charge}" if charge != 1 else str(mass_number))
+            mass_numbers.append(mass_number)
+            charges.append(charge)
+        
+        base = self.sweep_a_range(a_range=a_range, b_range=b_range, n_a=n_a, n_b=n_b, workers=workers)
+        n_points = len(base['a_prime'])
+        
+        mass_ratio = (np.array(mass_numbers, dtype=float) * m_p / self.m_ion)[:, None]
+        charge_ratio = (np.array(charges, dtype=float) / self.Z_ion)[:, None]
+        
+        V_rf_required = base['V_rf_required'] * mass_ratio / charge_ratio
+        q = np.broadcast_to(base['q'], V_rf_required.shape)
+        depth = np.broadcast_to(base['depth'] * mass_ratio, V_rf_required.shape)
+        
+        columns = {key: np.tile(base[key], len(names)) for key in ('a_prime', 'b_prime', 'height', 'F_rf')}
+        columns['V_rf_required'] = V_rf_required.ravel()
+        columns['q'] = q.ravel()
+        columns['depth'] = depth.ravel()
+        columns.update({key: value.ravel() for key, value in self.feasibility_flags(V_rf_required, q, depth).items()})
+        columns['species'] = np.repeat(np.array(names), n_points)
+        columns['ion_mass_number'] = np.repeat(np.array(mass_numbers), n_points)
+        columns['ion_charge'] = np.repeat(np.array(charges), n_points)
+        
+        return columns
+    
+    def feasible_frequency_intervals(self, a_prime_values, b_prime_values, F_rf_range=(10, 50)):
+        """
+        Exact feasible F_rf interval for each (a', b') geometry
+        At fixed secular frequency q_required ~ 1/F_rf and V_rf_required ~ F_rf, while
+        the trap depth does not depend on F_rf at all, so every constraint reduces to a
+        bound on F_rf. The optimal point (lowest V_rf) sits at the lower end of the interval.
+        Returns: dict of column arrays, one entry per geometry with b' > a'
+        """
+        a_prime = np.asarray(a_prime_values, dtype=float).ravel()
+        b_prime = np.asarray(b_prime_values, dtype=float).ravel()
+        
+        # Skip unrealistic geometries
+        valid = b_prime > a_prime
+        a_prime = a_prime[valid]
+        b_prime = b_prime[valid]
+        
+        # Values at F_rf = 1 MHz give the scaling coefficients
+        V_rf_slope, q_scale = self.required_vrf_array(
+            a_prime, b_prime, self.target_specs['secular_freq'], 1.0
+        )
+        depth = self.calculate_trap_depth(a_prime, b_prime, V_rf_slope, 1.0)
+        
+        # q_required <= q_max  ->  F_rf >= q_scale / q_max
+        # V_rf_required <= V_rf_max  ->  F_rf <= V_rf_max / V_rf_slope
+        F_rf_min = np.maximum(F_rf_range[0], q_scale / self.target_specs['q_max'])
+        F_rf_max = np.minimum(F_rf_range[1], self.target_specs['V_rf_max'] / V_rf_slope)
+        
+        depth_feasible = (self.target_specs['depth_min'] <= depth) & (depth <= self.target_specs['depth_max'])
+        feasible = depth_feasible & (F_rf_min <= F_rf_max)
+        
+        return {
+            'a_prime': a_prime,
+            'b_prime': b_prime,
+            'height': self.calculate_trap_height(a_prime, b_prime),
+            'depth': depth,
+            'F_rf_min': np.where(feasible, F_rf_min, np.nan),
+            'F_rf_max': np.where(feasible, F_rf_max, np.nan),
+            'F_rf_opt': np.where(feasible, F_rf_min, np.nan),
+            'V_rf_opt': np.where(feasible, V_rf_slope * F_rf_min, np.nan),
+            'q_opt': np.where(feasible, q_scale / F_rf_min, np.nan),
+            'feasible': feasible
+        }
+    
+    def solve_a_range_analytic(self, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, F_rf_range=(10, 50)):
+        """
+        Analytic counterpart of analyze_a_range: one evaluation per geometry instead of
+        sampling F_rf. Returns: dict of column arrays (see feasible_frequency_intervals)
+        """
+        a_prime_values = np.linspace(a_range[0], a_range[1], n_a)
+        b_prime_values = np.linspace(b_range[0], b_range[1], n_b)
+        a_grid, b_grid = np.meshgrid(a_prime_values, b_prime_values, indexing='ij')
+        
+        return self.feasible_frequency_intervals(a_grid, b_grid, F_rf_range=F_rf_range)
+    
+    def geometry_feasible(self, a_prime_values, b_prime_values, F_rf_range=(10, 50)):
+        """
+        True for each (a', b') geometry with a non-empty feasible F_rf interval
+        Geometries with b' <= a' are reported as infeasible
+        """
+        a_prime = np.asarray(a_prime_values, dtype=float).ravel()
+        b_prime = np.asarray(b_prime_values, dtype=float).ravel()
+        
+        feasible = np.zeros(len(a_prime), dtype=bool)
+        valid = b_prime > a_prime
+        feasible[valid] = self.feasible_frequency_intervals(a_prime[valid], b_prime[valid], F_rf_range)['feasible']
+        
+        return feasible
+    
+    def refine_feasibility_boundary(self, a_range=(50, 75), b_range=(70, 150), n_a=8, n_b=8, tol=1.0,
+                                    F_rf_range=(10, 50), n_bisect=None):
+        """
+        Adaptive quadtree refinement of the feasible region in (a', b')
+        Starts from an n_a x n_b grid of cells and only subdivides cells whose corners
+        disagree on feasibility, halving each axis until its cell edge is at most tol (um),
+        so the finest cells are about tol wide in both a' and b'. A cell whose corners
+        agree is still split when a refined neighbour finds a crossing on their shared
+        edge, so the boundary is followed across coarse cells; features smaller than a
+        coarse cell that touch no boundary cell are not detected. Crossings are located by
+        n_bisect bisection steps per edge, by default enough for tol / 16.
+        Returns: dict with
+          'cells': list of leaf cells (a_min, a_max, b_min, b_max, state) where state is
+                   'feasible', 'infeasible' or 'boundary'
+          'boundary': list of (n, 2) arrays of (a', b') vertices tracing the boundary,
+                      closed loops repeat their first vertex
+          'n_evaluations': number of geometries evaluated
+        """
+        a_span = a_range[1] - a_range[0]
+        b_span = b_range[1] - b_range[0]
+        a_scale = 2**int(max(0, np.ceil(np.log2(a_span / n_a / tol))))
+        b_scale = 2**int(max(0, np.ceil(np.log2(b_span / n_b / tol))))
+        if n_bisect is None:
+            edge = max(a_span / (n_a * a_scale), b_span / (n_b * b_scale))
+            n_bisect = int(max(0, np.ceil(np.log2(16 * edge / tol))))
+        
+        # Cells live on an integer lattice at the finest resolution
+        def to_coords(i, j):
+            i = np.asarray(i, dtype=float)
+            j = np.asarray(j, dtype=float)
+            return a_range[0] + i * a_span / (n_a * a_scale), b_range[0] + j * b_span / (n_b * b_scale)
+        
+        states = {}
+        
+        def evaluate(keys):
+            new_keys = list({key for key in keys if key not in states})
+            if new_keys:
+                i, j = np.array(new_keys).T
+                a_prime, b_prime = to_coords(i, j)
+                for key, state in zip(new_keys, self.geometry_feasible(a_prime, b_prime, F_rf_range)):
+                    states[key] = bool(state)
+        
+        def corners(cell):
+            i, j, size_a, size_b = cell
+            return [(i, j), (i + size_a, j), (i + size_a, j + size_b), (i, j + size_b)]
+        
+        def edge_points(cell):
+            i, j, size_a, size_b = cell
+            for k in range(1, size_a):
+                yield from ((i + k, j), (i + k, j + size_b))
+            for k in range(1, size_b):
+                yield from ((i, j + k), (i + size_a, j + k))
+        
+        def split_cell(cell):
+            # Halve every axis that is not yet at the finest resolution
+            i, j, size_a, size_b = cell
+            half_a, half_b = max(size_a // 2, 1), max(size_b // 2, 1)
+            return [(i + di, j + dj, half_a, half_b) for di in range(0, size_a, half_a) for dj in range(0, size_b, half_b)]
+        
+        def refine(cells):
+            while cells:
+                evaluate([key for cell in cells for key in corners(cell)])
+                next_cells = []
+                for cell in cells:
+                    corner_states = [states[key] for key in corners(cell)]
+                    if all(corner_states) or not any(corner_states):
+                        leaves[cell] = 'feasible' if corner_states[0] else 'infeasible'
+                    elif cell[2] == cell[3] == 1:
+                        leaves[cell] = 'boundary'
+                    else:
+                        next_cells += split_cell(cell)
+                cells = next_cells
+        
+        leaves = {}
+        refine([(i * a_scale, j * b_scale, a_scale, b_scale) for i in range(n_a) for j in range(n_b)])
+        
+        # Neighbour propagation: split uniform cells whose edges a refined neighbour found crossed
+        while True:
+            split = [cell for cell, state in leaves.items() if state != 'boundary' and cell[2] * cell[3] > 1 and
+                     any(states.get(key, state == 'feasible') != (state == 'feasible') for key in edge_points(cell))]
+            if not split:
+                break
+            for cell in split:
+                del leaves[cell]
+            refine([child for cell in split for child in split_cell(cell)])
+        leaves = sorted(leaves.items())
+        
+        # Marching squares on the finest boundary cells, crossings located by bisection
+        segments = []
+        crossing_edges = {}
+        for cell, state in leaves:
+            if state != 'boundary':
+                continue
+            keys = corners(cell)
+            edges = [tuple(sorted((keys[k], keys[(k + 1) % 4]))) for k in range(4)
+                     if states[keys[k]] != states[keys[(k + 1) % 4]]]
+            for edge in edges:
+                crossing_edges[edge] = None
+            segments += [(edges[0], edges[1])] if len(edges) == 2 else [(edges[0], edges[3]), (edges[1], edges[2])]
+        
+        if crossing_edges:
+            edge_list = list(crossing_edges)
+            start = np.array([edge[0] for edge in edge_list], dtype=float)
+            stop = np.array([edge[1] for edge in edge_list], dtype=float)
+            start_state = np.array([states[edge[0]] for edge in edge_list])
+            lo, hi = np.zeros(len(edge_list)), np.ones(len(edge_list))
+            for _ in range(n_bisect):
+                mid = (lo + hi) / 2
+                a_prime, b_prime = to_coords(*(start + mid[:, None] * (stop - start)).T)
+                same = self.geometry_feasible(a_prime, b_prime, F_rf_range) == start_state
+                lo = np.where(same, mid, lo)
+                hi = np.where(same, hi, mid)
+            crossing = start + ((lo + hi) / 2)[:, None] * (stop - start)
+            for edge, point in zip(edge_list, crossing):
+                crossing_edges[edge] = np.array(to_coords(*point))
+        
+        # Chain segments that share an edge crossing into polylines
+        touching = {}
+        for index, segment in enumerate(segments):
+            for edge in segment:
+                touching.setdefault(edge, []).append(index)
+        
+        used = [False] * len(segments)
+        boundary = []
+        for index in sorted(range(len(segments)), key=lambda k: min(len(touching[e]) for e in segments[k])):
+            if used[index]:
+                continue
+            used[index] = True
+            chain = list(segments[index])
+            for direction in (1, 0):
+                while True:
+                    end = chain[-1] if direction else chain[0]
+                    following = [k for k in touching[end] if not used[k]]
+                    if not following:
+                        break
+                    used[following[0]] = True
+                    a_edge, b_edge = segments[following[0]]
+                    nxt = b_edge if a_edge == end else a_edge
+                    if direction:
+                        chain.append(nxt)
+                    else:
+                        chain.insert(0, nxt)
+            boundary.append(np.array([crossing_edges[edge] for edge in chain]))
+        
+        cell_list = []
+        for (i, j, size_a, size_b), state in leaves:
+            a_min, b_min = to_coords(i, j)
+            a_max, b_max = to_coords(i + size_a, j + size_b)
+            cell_list.append({'a_min': float(a_min), 'a_max': float(a_max),
+                              'b_min': float(b_min), 'b_max': float(b_max), 'state': state})
+        
+        return {
+            'cells': cell_list,
+            'boundary': boundary,
+            'n_evaluations': len(states) + n_bisect * len(crossing_edges)
+        }
+    
+    def solve_geometry(self, height, F_rf, V_rf=None, secular_freq=None, branch='low', tol=1e-13, max_iter=60):
+        """
+        Inverse design: (a', b') that give the target ion height and secular frequency at
+        the given V_rf and F_rf. Inputs broadcast against each other, so many targets are
+        solved at once.
+        The height fixes a'b' = (height/height_correction)^2; with s = sqrt(b'/a') the q formula then
+        reduces to g(s) = s(s^2-1)/(1+s^2)^2 = c, which rises from s=1 to its maximum at
+        s^2 = 3+2*sqrt(2) and falls after. branch='low' solves on the rising side (b'/a'
+        below ~5.8), 'high' on the falling side; both use safeguarded Newton inside a bracket.
+        V_rf defaults to target_specs['V_rf_max'], secular_freq to target_specs['secular_freq'].
+        Returns: dict of column arrays like the sweep columns plus 'solved' and 'iterations';
+        targets with no solution (c above the maximum of g) are NaN with solved=False
+        """
+        V_rf = self.target_specs['V_rf_max'] if V_rf is None else V_rf
+        secular_freq = self.target_specs['secular_freq'] if secular_freq is None else secular_freq
+        height, F_rf, V_rf, secular_freq = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                                                for x in (height, F_rf, V_rf, secular_freq)))
+        shape = height.shape
+        height, F_rf, V_rf, secular_freq = (x.ravel() for x in (height, F_rf, V_rf, secular_freq))
+        
+        # Geometric factor needed to hit the target with this drive, from the q formula
+        omega_rf = 2 * np.pi * F_rf * MHz
+        q_required = 2 * np.sqrt(2) * (2 * np.pi * secular_freq * MHz) / omega_rf
+        geometric_factor = q_required * self.m_ion * omega_rf**2 / (self.Z_ion * q_e * V_rf)
+        
+        product = (height / self.height_correction)**2  # a' * b'
+        c = geometric_factor * np.pi * product / (8 * um**2)
+        
+        def g(s):
+            return s * (s**2 - 1) / (1 + s**2)**2
+        
+        def dg(s):
+            return (-s**4 + 6 * s**2 - 1) / (1 + s**2)**3
+        
+        s_peak = np.sqrt(3 + 2 * np.sqrt(2))
+        solvable = (c > 0) & (c <= g(s_peak))
+        c = np.where(solvable, c, g(s_peak) / 2)
+        
+        # Bracket [lo, hi] with g - c < 0 at lo_side and > 0 at the other end
+        if branch == 'low':
+            lo = np.ones_like(c)
+            hi = np.full_like(c, s_peak)
+            sign = 1.0
+        elif branch == 'high':
+            # g(s) < 1/s, so g < c beyond s = 1/c
+            lo = np.full_like(c, s_peak)
+            hi = 1 / c + 1
+            sign = -1.0
+        else:
+            raise ValueError("branch must be 'low' or 'high'")
+        
+        s = (lo + hi) / 2
+        iterations = np.zeros(len(c), dtype=int)
+        active = solvable.copy()
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            residual = sign * (g(s) - c)
+            # Residual is increasing in s on the oriented bracket
+            lo = np.where(active & (residual < 0), s, lo)
+            hi = np.where(active & (residual >= 0), s, hi)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = s - (g(s) - c) / dg(s)
+            inside = (newton >= lo) & (newton <= hi)
+            s_next = np.where(inside, newton, (lo + hi) / 2)
             
-            for sol in vrf_solutions:
-                if sol['V_rf_required'] > 0:  # Only positive voltages
-                    # Calculate other parameters
-                    depth = self.calculate_trap_depth(a_prime, b_prime, sol['V_rf_required'], sol['F_rf'])
+            # Near the peak of g the root is double, so also accept a residual at rounding level
+            converged = ((np.abs(s_next - s) <= tol * s_next) | (hi - lo <= tol * s_next)
+                         | (np.abs(residual) <= 4 * np.finfo(float).eps * c))
+            s = np.where(active, s_next, s)
+            iterations += active
+            active &= ~converged
+        
+        ratio = s**2
+        a_prime = np.where(solvable, np.sqrt(product / ratio), np.nan)
+        b_prime = np.where(solvable, np.sqrt(product * ratio), np.nan)
+        q = np.where(solvable, q_required, np.nan)
+        V_out = np.where(solvable, V_rf, np.nan)
+        depth = self.calculate_trap_depth(a_prime, b_prime, V_out, F_rf)
+        
+        columns = {
+            'a_prime': a_prime,
+            'b_prime': b_prime,
+            'height': self.calculate_trap_height(a_prime, b_prime),
+            'F_rf': F_rf,
+            'V_rf_required': V_out,
+            'q': q,
+            'depth': depth
+        }
+        columns.update(self.feasibility_flags(V_out, q, depth))
+        columns['solved'] = solvable & ~active
+        columns['iterations'] = iterations
+        
+        return {key: value.reshape(shape) for key, value in columns.items()}
+    
+    def export_lookup_tables(self, path, a_range=(30, 100), b_range=(40, 200), F_rf_range=(10, 50),
+                             n_a=71, n_b=81, n_F=41, tile_size=32, encoding='uint16',
+                             fields=('V_rf_required', 'q', 'depth')):
+        """
+        Precompute dense (a', b', F_rf) tables for the web frontend
+        Writes path/index.json plus one little-endian binary file per (a', b') tile. Each
+        tile file holds, per field in header order, an array of shape (tile a', tile b', n_F).
+        encoding='uint16' stores log(value) quantized with the per-field scale and offset
+        from the header (value = exp(code * scale + offset)), code 65535 marks points with
+        b' <= a' or V_rf <= 0; encoding='float16' stores the values directly with NaN there
+        (and inf above the float16 range).
+        Tables are for target_specs['secular_freq']; q and V_rf scale linearly and the depth
+        quadratically with it, recorded as 'secular_freq_exponent' per field.
+        Returns: the header dict
+        """
+        a_values = np.linspace(a_range[0], a_range[1], n_a)
+        b_values = np.linspace(b_range[0], b_range[1], n_b)
+        F_values = np.linspace(F_rf_range[0], F_rf_range[1], n_F)
+        
+        a_grid, b_grid = np.meshgrid(a_values, b_values, indexing='ij')
+        valid = b_grid > a_grid
+        
+        geometric_factor, g_factor = self.geometry_factors(a_grid, b_grid)
+        geometric_factor = np.where(valid, geometric_factor, np.nan)
+        g_factor = np.where(valid, g_factor, np.nan)
+        V_rf_required, q_required = self._required_vrf_from_factor(
+            geometric_factor[:, :, None], self.target_specs['secular_freq'], F_values[None, None, :]
+        )
+        depth = self._trap_depth_from_factor(g_factor[:, :, None], V_rf_required, F_values[None, None, :])
+        q_required = np.broadcast_to(q_required, V_rf_required.shape)
+        
+        usable = valid[:, :, None] & (V_rf_required > 0)
+        tables = {
+            'V_rf_required': np.where(usable, V_rf_required, np.nan),
+            'q': np.where(usable, q_required, np.nan),
+            'depth': np.where(usable, depth, np.nan)
+        }
+        
+        header = {
+            'format': 'chip-parameter-lut',
+            'version': 1,
+            'encoding': encoding,
+            'byte_order': 'little',
+            'ion_mass_number': self.N_ion,
+            'ion_charge': self.Z_ion,
+            'secular_freq': self.target_specs['secular_freq'],
+            'axes': {
+                'a_prime': {'min': float(a_range[0]), 'max': float(a_range[1]), 'n': n_a},
+                'b_prime': {'min': float(b_range[0]), 'max': float(b_range[1]), 'n': n_b},
+                'F_rf': {'min': float(F_rf_range[0]), 'max': float(F_rf_range[1]), 'n': n_F}
+            },
+            'fields': [],
+            'tile_size': tile_size,
+            'tiles': []
+        }
+        
+        encoded = {}
+        for name in fields:
+            values = tables[name]
+            field = {'name': name, 'secular_freq_exponent': 2 if name == 'depth' else 1}
+            if encoding == 'uint16':
+                # Log quantization keeps the relative error uniform across the range
+                logs = np.log(values)
+                offset = float(np.nanmin(logs))
+                scale = float(max(np.nanmax(logs) - offset, 1e-12) / 65534)
+                codes = np.rint((logs - offset) / scale)
+                encoded[name] = np.where(np.isnan(codes), 65535, codes).astype('<u2')
+                field.update({'scale': scale, 'offset': offset, 'transform': 'log', 'missing': 65535})
+            elif encoding == 'float16':
+                # Values above the float16 range (V_rf > 65504 V near b' = a') become inf
+                with np.errstate(over='ignore'):
+                    encoded[name] = values.astype('<f2')
+            else:
+                raise ValueError("encoding must be 'uint16' or 'float16'")
+            header['fields'].append(field)
+        
+        os.makedirs(path, exist_ok=True)
+        for a_start in range(0, n_a, tile_size):
+            for b_start in range(0, n_b, tile_size):
+                a_stop = min(a_start + tile_size, n_a)
+                b_stop = min(b_start + tile_size, n_b)
+                
+                # Tiles entirely in b' <= a' carry no data
+                if not valid[a_start:a_stop, b_start:b_stop].any():
+                    continue
+                
+                name = f"tile_{a_start // tile_size}_{b_start // tile_size}.bin"
+                with open(os.path.join(path, name), 'wb') as f:
+                    for field in fields:
+                        f.write(np.ascontiguousarray(encoded[field][a_start:a_stop, b_start:b_stop]).tobytes())
+                header['tiles'].append({
+                    'file': name,
+                    'a_index': [a_start, a_stop],
+                    'b_index': [b_start, b_stop],
+                    'bytes': os.path.getsize(os.path.join(path, name))
+                })
+        
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump(header, f, indent=1)
+        
+        return header
+    
+    def write_sweep_store(self, path, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, F_rf_range=(10, 50),
+                          n_F=100, dtype='float64', chunk_points=1 << 22, workers=None):
+        """
+        Sweep the a' x b' grid chunk by chunk into an on-disk column store (see SweepStore)
+        Writes path/index.json plus one little-endian file per column: the physics columns
+        as raw dtype ('float32' halves the size) and the feasibility flags bit-packed, 1 bit
+        per point. Each chunk of about chunk_points points is swept, appended and dropped,
+        so memory does not grow with the sweep. Rows are in sweep_a_range order.
+        workers > 1 sweeps every chunk on one process pool kept for the whole run.
+        Returns: the header dict
+        """
+        dtype = np.dtype(dtype).newbyteorder('<')
+        a_values = np.linspace(a_range[0], a_range[1], n_a)
+        b_values = np.linspace(b_range[0], b_range[1], n_b)
+        n_geometries = n_a * n_b
+        step = max(1, chunk_points // n_F)
+        
+        header = {
+            'format': 'chip-parameter-sweep',
+            'version': 1,
+            'byte_order': 'little',
+            'ion_mass_number': self.N_ion,
+            'ion_charge': self.Z_ion,
+            'target_specs': dict(self.target_specs),
+            'axes': {
+                'a_prime': {'min': float(a_range[0]), 'max': float(a_range[1]), 'n': n_a},
+                'b_prime': {'min': float(b_range[0]), 'max': float(b_range[1]), 'n': n_b},
+                'F_rf': {'min': float(F_rf_range[0]), 'max': float(F_rf_range[1]), 'n': n_F}
+            },
+            'columns': [{'name': name, 'file': f"{name}.bin", 'dtype': dtype.str} for name in PHYSICS_COLUMNS],
+            'flags': [{'name': name, 'file': f"{name}.bits", 'encoding': 'packbits'} for name in FLAG_COLUMNS],
+            'chunks': [],
+            'n_points': 0
+        }
+        
+        os.makedirs(path, exist_ok=True)
+        # index.json is written last, so an interrupted run leaves no readable store
+        if os.path.exists(os.path.join(path, 'index.json')):
+            os.remove(os.path.join(path, 'index.json'))
+        files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name in PHYSICS_COLUMNS}
+        files.update({name: open(os.path.join(path, f"{name}.bits"), 'wb') for name in FLAG_COLUMNS})
+        # Flag bits not yet filling a whole byte, carried into the next chunk
+        carry = {name: np.zeros(0, dtype=bool) for name in FLAG_COLUMNS}
+        
+        parallel = workers is not None and workers > 1
+        if parallel:
+            from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext()
+        
+        try:
+            with pool as executor:
+                for start in range(0, n_geometries, step):
+                    index = np.arange(start, min(start + step, n_geometries))
+                    if parallel:
+                        columns = self.sweep_parallel(a_values[index // n_b], b_values[index % n_b], F_rf_range=F_rf_range,
+                                                      n_F=n_F, workers=workers, executor=executor)
+                    else:
+                        columns = self.sweep_geometries(a_values[index // n_b], b_values[index % n_b],
+                                                        F_rf_range=F_rf_range, n_F=n_F)
+                    n = len(columns['a_prime'])
                     
-                    # Check if meets all criteria
-                    meets_criteria = (
-                        sol['q_required'] <= self.target_specs['q_max'] and
-                        sol['V_rf_required'] <= self.target_specs['V_rf_max'] and
-                        self.target_specs['depth_min'] <= depth <= self.target_specs['depth_max']
-                    )
+                    # Only the file output is timed here, the sweep stages record themselves
+                    with self.profiler.stage('store_write'):
+                        for name in PHYSICS_COLUMNS:
+                            columns[name].astype(dtype).tofile(files[name])
+                        for name in FLAG_COLUMNS:
+                            bits = np.concatenate((carry[name], columns[name]))
+                            whole = len(bits) - len(bits) % 8
+                            np.packbits(bits[:whole]).tofile(files[name])
+                            carry[name] = bits[whole:]
                     
-                    results.append({
-                        'a_prime': a_prime,
-                        'b_prime': b_prime,
-                        'height': height,
-                        'F_rf': sol['F_rf'],
-                        'V_rf_required': sol['V_rf_required'],
-                        'q': sol['q_required'],
-                        'depth': depth,
-                        'meets_criteria': meets_criteria,
-                        'V_rf_feasible': sol['V_rf_required'] <= self.target_specs['V_rf_max'],
-                        'q_feasible': sol['q_required'] <= self.target_specs['q_max'],
-                        'depth_feasible': self.target_specs['depth_min'] <= depth <= self.target_specs['depth_max']
-                    })
-        
-        return results
-    
-    def analyze_a_range(self, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30):
+                    header['chunks'].append([header['n_points'], header['n_points'] + n])
+                    header['n_points'] += n
+            
+            for name in FLAG_COLUMNS:
+                np.packbits(carry[name]).tofile(files[name])
+        finally:
+            for f in files.values():
+                f.close()
+        
+        with open(os.path.join(path, 'index.json'), 'w') as f:
+            json.dump(header, f, indent=1)
+        
+        return header
+    
+    def analyze_a70_limitations(self, b_prime_range=(80, 150), n_points=50, workers=None):
+        """
+        Analyze limitations when a'=70
+        workers > 1 shards the b' axis across a process pool
+        """
+        a_prime = 70
+        b_prime_values = np.linspace(b_prime_range[0], b_prime_range[1], n_points)
+        
+        columns = self.sweep_geometries(np.full(n_points, a_prime), b_prime_values, workers=workers)
+        
+        with self.profiler.stage('records'):
+            return columns_to_records(columns)
+    
+    def analyze_a_range(self, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, workers=None):
         """
         Analyze parameter space for a' < 70
+        workers > 1 shards the a' axis across a process pool
         Returns: (all_results, feasible_results)
         """
+        columns = self.sweep_a_range(a_range=a_range, b_range=b_range, n_a=n_a, n_b=n_b, workers=workers)
+        with self.profiler.stage('records'):
+            results = columns_to_records(columns)
+        
+        # Separate feasible solutions
+        feasible_results = [r for r in results if r['meets_criteria']]
+        
+        return results, feasible_results
+    
+    def sweep_result(self, a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30, workers=None):
+        """Sweep the a' x b' grid into a SweepResult for fast threshold re-evaluation"""
+        columns = self.sweep_a_range(a_range=a_range, b_range=b_range, n_a=n_a, n_b=n_b, workers=workers)
+        return SweepResult(columns, self.target_specs)
+    
+    def sweep_summary(self, columns):
+        """Feasibility counts and minimum V_rf of a sweep, as plain JSON-serializable values"""
+        feasible = columns['meets_criteria']
+        return {
+            'target_specs': dict(self.target_specs),
+            'n_points': int(len(feasible)),
+            'n_feasible': int(feasible.sum()),
+            'n_V_rf_feasible': int(columns['V_rf_feasible'].sum()),
+            'n_q_feasible': int(columns['q_feasible'].sum()),
+            'n_depth_feasible': int(columns['depth_feasible'].sum()),
+            'min_V_rf': float(columns['V_rf_required'].min()) if len(feasible) else None,
+            'min_feasible_V_rf': float(columns['V_rf_required'][feasible].min()) if feasible.any() else None
+        }
+    
+    def stream_top_solutions(self, a_range=(50, 75), b_range=(70, 150), n_a=30, n_b=40,
+                             max_solutions=50, chunk_size=4096, keep_all=False, workers=None):
+        """
+        Streaming top-k search over the a' x b' grid
+        Geometries are processed in chunks of about chunk_size and the best max_solutions
+        points (lowest V_rf) are kept in a bounded heap. A chunk is skipped when its lower
+        bound on feasible V_rf cannot beat the current k-th best. workers > 1 sweeps the
+        chunks on one process pool kept for the whole search.
+        Returns: (best_solutions sorted by V_rf, all_results or None if keep_all is False)
+        """
+        if max_solutions <= 0 and not keep_all:
+            return [], None
+        
         a_prime_values = np.linspace(a_range[0], a_range[1], n_a)
         b_prime_values = np.linspace(b_range[0], b_range[1], n_b)
+        rows_per_chunk = max(1, chunk_size // max(n_b, 1))
         
-        results = []
+        heap = []  # entries: (-V_rf, -index, record), worst solution on top
+        all_results = [] if keep_all else None
+        offset = 0
         
-        for a_prime in a_prime_values:
-            for b_prime in b_prime_values:
-                if b_prime <= a_prime:  # Skip unrealistic geometries
-                    continue
-                    
-                height = self.calculate_trap_height(a_prime, b_prime)
+        parallel = workers is not None and workers > 1
+        if parallel:
+            from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext()
+        
+        with pool as executor:
+            for start in range(0, n_a, rows_per_chunk):
+                a_grid, b_grid = np.meshgrid(a_prime_values[start:start + rows_per_chunk], b_prime_values, indexing='ij')
+                
+                # Lower bound on feasible V_rf: V_rf grows with F_rf and q_max sets the lowest usable F_rf
+                if not keep_all and len(heap) >= max_solutions:
+                    intervals = self.feasible_frequency_intervals(a_grid, b_grid)
+                    bound = np.nanmin(intervals['V_rf_opt']) if intervals['feasible'].any() else np.inf
+                    if bound > -heap[0][0]:
+                        continue
                 
-                # Find required V_rf for target secular frequency
-                vrf_solutions = self.find_required_vrf_for_secular_freq(
-                    a_prime, b_prime, self.target_specs['secular_freq']
-                )
+                if parallel:
+                    columns = self.sweep_parallel(a_grid, b_grid, workers=workers, executor=executor)
+                else:
+                    columns = self.sweep_geometries(a_grid, b_grid)
+                n_points = len(columns['a_prime'])
+                if keep_all:
+                    all_results.extend(columns_to_records(columns))
                 
-                for sol in vrf_solutions:
-                    if sol['V_rf_required'] > 0:  # Only positive voltages
-                        # Calculate other parameters
-                        depth = self.calculate_trap_depth(a_prime, b_prime, sol['V_rf_required'], sol['F_rf'])
-                        
-                        # Check if meets all criteria
-                        meets_criteria = (
-                            sol['q_required'] <= self.target_specs['q_max'] and
-                            sol['V_rf_required'] <= self.target_specs['V_rf_max'] and
-                            self.target_specs['depth_min'] <= depth <= self.target_specs['depth_max']
-                        )
-                        
-                        results.append({
-                            'a_prime': a_prime,
-                            'b_prime': b_prime,
-                            'height': height,
-                            'F_rf': sol['F_rf'],
-                            'V_rf_required': sol['V_rf_required'],
-                            'q': sol['q_required'],
-                            'depth': depth,
-                            'meets_criteria': meets_criteria,
-                            'V_rf_feasible': sol['V_rf_required'] <= self.target_specs['V_rf_max'],
-                            'q_feasible': sol['q_required'] <= self.target_specs['q_max'],
-                            'depth_feasible': self.target_specs['depth_min'] <= depth <= self.target_specs['depth_max']
-                        })
+                for i in np.flatnonzero(columns['meets_criteria']):
+                    key = (-columns['V_rf_required'][i], -(offset + i))
+                    if len(heap) < max_solutions:
+                        heapq.heappush(heap, key + ({name: columns[name][i].item() for name in RESULT_COLUMNS},))
+                    elif heap and key > heap[0][:2]:
+                        heapq.heapreplace(heap, key + ({name: columns[name][i].item() for name in RESULT_COLUMNS},))
+                
+                offset += n_points
         
-        # Separate feasible solutions
-        feasible_results = [r for r in results if r['meets_criteria']]
+        best_solutions = [entry[2] for entry in sorted(heap, key=lambda e: (-e[0], -e[1]))]
         
-        return results, feasible_results
+        return best_solutions, all_results
     
-    def find_all_feasible_solutions(self, a_range=(50, 75), max_solutions=50):
+    def find_all_feasible_solutions(self, a_range=(50, 75), max_solutions=50,
+                                    streaming=False, chunk_size=4096, keep_all=True, n_a=30, n_b=40):
         """
         Find all feasible solutions that meet the target specifications
+        With streaming=True the ranking runs through stream_top_solutions, so memory
+        depends on max_solutions; keep_all=False then returns None for all_results
         """
         print(f"Searching for solutions with target specifications:")
         print(f"  Secular frequency: {self.target_specs['secular_freq']} MHz")
@@ -221,266 +1468,1026 @@ class EnhancedIonTrapOptimizer:
         print(f"  Trap depth: {self.target_specs['depth_min']}-{self.target_specs['depth_max']} eV")
         print()
         
+        if streaming:
+            return self.stream_top_solutions(a_range=a_range, n_a=n_a, n_b=n_b, max_solutions=max_solutions,
+                                             chunk_size=chunk_size, keep_all=keep_all)
+        
         # Analyze the full range
-        all_results, feasible_results = self.analyze_a_range(a_range=a_range, n_a=30, n_b=40)
+        all_results, feasible_results = self.analyze_a_range(a_range=a_range, n_a=n_a, n_b=n_b)
         
         # Sort by how close to optimal (lower V_rf is better)
         feasible_results.sort(key=lambda x: x['V_rf_required'])
         
         # Limit number of solutions
         if len(feasible_results) > max_solutions:
-            feasible_results = feasible_results[:max_solutions]
+            feasible_results = feasible_results[:max(max_solutions, 0)]
         
         return feasible_results, all_results
     
-    def visualize_comprehensive_analysis(self, figsize=(20, 16)):
+    def tolerance_analysis(self, candidate, n_samples=1_000_000, tolerances=None, seed=None,
+                           chunk_size=262144, workers=None, height_range=None, sec_freq_tol=None):
+        """
+        Monte Carlo robustness of one design point under fabrication and drive tolerances
+        candidate is a result dict (e.g. from find_all_feasible_solutions) with a_prime,
+        b_prime, F_rf and V_rf_required. a', b', V_rf, F_rf and the height correction factor
+        are drawn from normal distributions around their nominal values with the 1-sigma
+        values in tolerances (missing keys fall back to DEFAULT_TOLERANCES).
+        Samples are evaluated in vectorized chunks, each with its own random stream spawned
+        from np.random.SeedSequence(seed), so the result depends on seed and chunk_size but
+        not on workers. Besides target_specs, height_range=(low, high) in um and a relative
+        secular frequency tolerance sec_freq_tol can be required.
+        Returns dict with probabilities per constraint and overall (p_meets_criteria), and
+        mean/std/min/max for height, q, depth and secular_freq
+        """
+        if n_samples < 1:
+            raise ValueError("n_samples must be at least 1")
+        unknown = set(tolerances or {}) - set(DEFAULT_TOLERANCES)
+        if unknown:
+            raise KeyError(f"unknown tolerance keys: {sorted(unknown)}")
+        sigma = dict(DEFAULT_TOLERANCES, **(tolerances or {}))
+        nominal = {
+            'a_prime': float(candidate['a_prime']),
+            'b_prime': float(candidate['b_prime']),
+            'V_rf': float(candidate['V_rf_required']),
+            'F_rf': float(candidate['F_rf']),
+            'correction': self.height_correction
+        }
+        
+        sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+        streams = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(self, nominal, sigma, size, stream, height_range, sec_freq_tol) for size, stream in zip(sizes, streams)]
+        
+        with self.profiler.stage('tolerance_analysis'):
+            if workers is not None and workers > 1:
+                from concurrent.futures import ProcessPoolExecutor
+                
+                worker = copy.copy(self)
+                worker.profiler = NULL_PROFILER
+                tasks = [(worker,) + task[1:] for task in tasks]
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    parts = list(executor.map(_tolerance_chunk, tasks))
+            else:
+                parts = [_tolerance_chunk(task) for task in tasks]
+        self.profiler.count('samples', n_samples)
+        
+        # Merge in chunk order so floating-point sums do not depend on scheduling
+        result = {'n_samples': n_samples, 'nominal': nominal, 'tolerances': sigma}
+        for key in parts[0]['counts']:
+            result[f"p_{key}"] = sum(part['counts'][key] for part in parts) / n_samples
+        for name in TOLERANCE_QUANTITIES:
+            total = sum(part['stats'][name][0] for part in parts)
+            total_sq = sum(part['stats'][name][1] for part in parts)
+            mean = total / n_samples
+            result[name] = {
+                'mean': mean,
+                'std': float(np.sqrt(max(total_sq / n_samples - mean**2, 0.0))),
+                'min': min(part['stats'][name][2] for part in parts),
+                'max': max(part['stats'][name][3] for part in parts)
+            }
+        
+        return result
+    
+    def _tolerance_samples(self, nominal, sigma, n, stream, height_range=None, sec_freq_tol=None):
+        """Sample and evaluate one chunk of tolerance_analysis, returning counts and sums"""
+        rng = np.random.default_rng(stream)
+        z = rng.standard_normal((5, n))
+        a_prime = nominal['a_prime'] + sigma['a_prime'] * z[0]
+        b_prime = nominal['b_prime'] + sigma['b_prime'] * z[1]
+        V_rf = nominal['V_rf'] * (1 + sigma['V_rf'] * z[2])
+        F_rf = nominal['F_rf'] * (1 + sigma['F_rf'] * z[3])
+        correction = nominal['correction'] + sigma['correction'] * z[4]
+        
+        geometric_factor, g_factor = self.geometry_factors(a_prime, b_prime)
+        omega_rf = 2 * np.pi * F_rf * MHz
+        q = np.abs((self.Z_ion * q_e * V_rf) / (self.m_ion * omega_rf**2) * geometric_factor)
+        depth = self._trap_depth_from_factor(g_factor, V_rf, F_rf)
+        height = correction * np.sqrt(a_prime * b_prime)
+        secular_freq = q * F_rf / (2 * np.sqrt(2))
+        
+        # Samples with b' <= a' are not a valid trap
+        valid = b_prime > a_prime
+        flags = self.feasibility_flags(V_rf, q, depth)
+        flags = {key: value & valid for key, value in flags.items()}
+        if height_range is not None:
+            flags['height_feasible'] = valid & (height_range[0] <= height) & (height <= height_range[1])
+            flags['meets_criteria'] &= flags['height_feasible']
+        if sec_freq_tol is not None:
+            target = self.target_specs['secular_freq']
+            flags['sec_freq_feasible'] = valid & (np.abs(secular_freq - target) <= sec_freq_tol * target)
+            flags['meets_criteria'] &= flags['sec_freq_feasible']
+        
+        values = {'height': height, 'q': q, 'depth': depth, 'secular_freq': secular_freq}
+        return {
+            'counts': {key: int(np.count_nonzero(value)) for key, value in flags.items()},
+            'stats': {name: (float(np.sum(values[name])), float(np.sum(values[name]**2)),
+                             float(np.min(values[name])), float(np.max(values[name])))
+                      for name in TOLERANCE_QUANTITIES}
+        }
+    
+    def pareto_front(self, columns, objectives=None, feasible_only=True):
+        """
+        Non-dominated subset of sweep columns
+        objectives maps column name -> 'min' or 'max' (default PARETO_OBJECTIVES)
+        Returns: dict of column arrays for the Pareto front, sorted by the first objective
+        """
+        objectives = PARETO_OBJECTIVES if objectives is None else objectives
+        
+        candidates = np.flatnonzero(columns['meets_criteria']) if feasible_only else np.arange(len(columns['a_prime']))
+        values = np.column_stack([
+            columns[name][candidates] * (1 if sense == 'min' else -1)
+            for name, sense in objectives.items()
+        ])
+        
+        front = candidates[pareto_front_indices(values)]
+        
+        return {key: value[front] for key, value in columns.items()}
+    
+    def pareto_search(self, a_range=(50, 75), b_range=(70, 150), n_a=15, n_b=20, objectives=None, n_rounds=4):
+        """
+        Guided Pareto search: sweep a coarse a' x b' grid, then repeatedly sweep only the
+        neighbours of geometries on the current front at half the previous spacing
+        Returns: (front columns, number of geometries evaluated)
+        """
+        a_step = (a_range[1] - a_range[0]) / max(n_a - 1, 1)
+        b_step = (b_range[1] - b_range[0]) / max(n_b - 1, 1)
+        a_grid, b_grid = np.meshgrid(np.linspace(a_range[0], a_range[1], n_a),
+                                     np.linspace(b_range[0], b_range[1], n_b), indexing='ij')
+        
+        front = self.pareto_front(self.sweep_geometries(a_grid, b_grid), objectives)
+        evaluated = set(zip(a_grid.ravel().tolist(), b_grid.ravel().tolist()))
+        
+        for _ in range(n_rounds):
+            a_step /= 2
+            b_step /= 2
+            
+            candidates = set()
+            for a_prime, b_prime in set(zip(front['a_prime'].tolist(), front['b_prime'].tolist())):
+                for da in (-a_step, 0, a_step):
+                    for db in (-b_step, 0, b_step):
+                        point = (a_prime + da, b_prime + db)
+                        if (a_range[0] <= point[0] <= a_range[1] and b_range[0] <= point[1] <= b_range[1]
+                                and point not in evaluated):
+                            candidates.add(point)
+            if not candidates:
+                break
+            
+            evaluated |= candidates
+            a_new, b_new = np.array(sorted(candidates)).T
+            columns = self.sweep_geometries(a_new, b_new)
+            
+            # The front of (old front + new points) equals the front of everything evaluated
+            merged = {key: np.concatenate([front[key], columns[key]]) for key in front}
+            front = self.pareto_front(merged, objectives)
+        
+        return front, len(evaluated)
+    
+    def evaluate_spec_batch(self, spec_sets, a_range=(50, 75), b_range=(70, 150), n_a=30, n_b=40,
+                            max_block_bytes=2**26):
+        """
+        What-if evaluation of many target_specs variants on one sweep
+        spec_sets is a list of dicts (missing keys fall back to target_specs, unknown keys
+        raise KeyError) or an (n, 5) array with columns in SPEC_KEYS order. The physics is swept once at a
+        1 MHz secular frequency; q and V_rf scale linearly and the depth quadratically
+        with secular_freq, so each spec only rescales the shared columns.
+        Returns: dict of column arrays, one row per spec: the spec fields, n_feasible and
+        the lowest-V_rf feasible point (best_*, NaN when nothing is feasible)
+        """
+        if isinstance(spec_sets, np.ndarray):
+            specs = np.asarray(spec_sets, dtype=float)
+            if specs.ndim != 2 or specs.shape[1] != len(SPEC_KEYS):
+                raise ValueError(f"spec array must have shape (n, {len(SPEC_KEYS)}), got {specs.shape}")
+        else:
+            spec_sets = list(spec_sets)
+            unknown = set().union(*spec_sets) - set(SPEC_KEYS)
+            if unknown:
+                raise KeyError(f"unknown target_specs keys: {sorted(unknown)}")
+            specs = np.array([[spec.get(key, self.target_specs[key]) for key in SPEC_KEYS] for spec in spec_sets],
+                             dtype=float).reshape(-1, len(SPEC_KEYS))
+        
+        base = self.sweep_a_range(a_range=a_range, b_range=b_range, n_a=n_a, n_b=n_b, target_sec_freq=1.0)
+        n_points = len(base['a_prime'])
+        
+        table = {key: specs[:, k] for k, key in enumerate(SPEC_KEYS)}
+        table['n_feasible'] = np.zeros(len(specs), dtype=int)
+        best_index = np.full(len(specs), -1)
+        
+        # Specs sharing a secular frequency share the rescaled columns
+        block = max(1, max_block_bytes // max(8 * n_points, 1))
+        for sec_freq in np.unique(specs[:, 0]):
+            rows = np.flatnonzero(specs[:, 0] == sec_freq)
+            V_rf = base['V_rf_required'] * sec_freq
+            q = base['q'] * sec_freq
+            depth = base['depth'] * sec_freq**2
+            
+            for start in range(0, len(rows), block):
+                chunk = rows[start:start + block]
+                q_max, V_rf_max, depth_min, depth_max = (specs[chunk, k][:, None] for k in range(1, 5))
+                feasible = (q <= q_max) & (V_rf <= V_rf_max) & (depth_min <= depth) & (depth <= depth_max)
+                
+                table['n_feasible'][chunk] = feasible.sum(axis=1)
+                index = np.argmin(np.where(feasible, V_rf, np.inf), axis=1)
+                best_index[chunk] = np.where(feasible.any(axis=1), index, -1)
+        
+        found = best_index >= 0
+        picked = best_index[found]
+        for key in ('a_prime', 'b_prime', 'height', 'F_rf'):
+            table['best_' + key] = np.full(len(specs), np.nan)
+            table['best_' + key][found] = base[key][picked]
+        for key, power in (('V_rf_required', 1), ('q', 1), ('depth', 2)):
+            table['best_' + key] = np.full(len(specs), np.nan)
+            table['best_' + key][found] = base[key][picked] * specs[found, 0]**power
+        
+        return table
+    
+    def visualize_comprehensive_analysis(self, figsize=(20, 16), output=None, panels=None,
+                                         max_points=20000, show=None, a_range=(50, 69), b_range=(70, 150),
+                                         n_a=20, n_b=30, workers=None):
         """
         Create comprehensive visualization comparing a=70 vs a<70
+        output: file path (.png, .svg, ...) to render headless on the Agg canvas
+        panels: iterable of panel numbers 1-12 to draw (default all)
+        max_points: above this many points scatter panels switch to hexbin density
+                    (2D) or a rasterized, strided scatter (3D)
+        show: call plt.show(); defaults to True only when no output path is given
+        a_range, b_range, n_a, n_b, workers: the a'<70 sweep (see sweep_a_range)
         """
+        import matplotlib.pyplot as plt
+        import pandas as pd
+        
+        panels = sorted(set(range(1, 13) if panels is None else panels))
+        if show is None:
+            show = output is None
+        
         # Analyze a=70 limitations
         print("Analyzing a'=70 limitations...")
-        a70_results = self.analyze_a70_limitations()
+        a70 = self.sweep_geometries(np.full(50, 70.0), np.linspace(80, 150, 50))
         
         # Analyze a<70 possibilities
         print("Analyzing a'<70 possibilities...")
-        all_small_a, feasible_solutions = self.analyze_a_range()
+        small_a = self.sweep_a_range(a_range=a_range, b_range=b_range, n_a=n_a, n_b=n_b, workers=workers)
+        with self.profiler.stage('records'):
+            feasible_solutions = columns_to_records(
+                {key: small_a[key][small_a['meets_criteria']] for key in RESULT_COLUMNS}
+            )
         
         # Convert to DataFrames for easier analysis
-        df_a70 = pd.DataFrame(a70_results)
-        df_small_a = pd.DataFrame(all_small_a)
+        with self.profiler.stage('dataframe'):
+            df_a70 = pd.DataFrame(a70)
+            df_small_a = pd.DataFrame(small_a)
+        
+        draw_start = time.perf_counter()
+        
+        # Masks computed once and shared by all panels
+        a70_total = len(a70['a_prime'])
+        small_a_total = len(small_a['a_prime'])
+        small_a_feasible_mask = small_a['meets_criteria']
+        small_a_infeasible_mask = ~small_a_feasible_mask
+        a70_feasible = int(a70['meets_criteria'].sum())
+        small_a_feasible = int(small_a_feasible_mask.sum())
         
-        fig = plt.figure(figsize=figsize)
+        if output is not None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        else:
+            fig = plt.figure(figsize=figsize)
+        
+        # Full dashboard keeps the 3x4 layout, a selection is packed into rows of 4
+        n_cols = min(len(panels), 4)
+        n_rows = -(-len(panels) // 4)
+        position = {number: (number if len(panels) == 12 else index + 1) for index, number in enumerate(panels)}
+        
+        def add_axes(number, **kwargs):
+            return fig.add_subplot(3 if len(panels) == 12 else n_rows, 4 if len(panels) == 12 else n_cols,
+                                   position[number], **kwargs)
+        
+        def flag_panel(ax, x, y, flag, label, s, alpha=None):
+            if len(x) > max_points:
+                mappable = ax.hexbin(x, y, C=flag.astype(float), reduce_C_function=np.mean, gridsize=60,
+                                     cmap='RdYlGn', vmin=0, vmax=1)
+                label = label + ' (fraction)'
+            else:
+                mappable = ax.scatter(x, y, c=flag, cmap='RdYlGn', s=s, alpha=alpha)
+            fig.colorbar(mappable, ax=ax, label=label)
         
         # 1. V_rf requirements for a=70
-        ax1 = plt.subplot(3, 4, 1)
-        if len(df_a70) > 0:
-            scatter1 = ax1.scatter(df_a70['b_prime'], df_a70['V_rf_required'], 
-                                 c=df_a70['V_rf_feasible'], cmap='RdYlGn', s=30)
-            ax1.axhline(y=self.target_specs['V_rf_max'], color='red', linestyle='--', 
-                       label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
-            ax1.set_xlabel("b' (μm)")
-            ax1.set_ylabel('Required V_rf (V)')
-            ax1.set_title('a\'=70: V_rf Requirements')
-            ax1.legend()
-            ax1.grid(True, alpha=0.3)
-            plt.colorbar(scatter1, ax=ax1, label='V_rf Feasible')
+        if 1 in panels:
+            ax1 = add_axes(1)
+            if a70_total > 0:
+                flag_panel(ax1, a70['b_prime'], a70['V_rf_required'], a70['V_rf_feasible'], 'V_rf Feasible', s=30)
+                ax1.axhline(y=self.target_specs['V_rf_max'], color='red', linestyle='--', 
+                           label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
+                ax1.set_xlabel("b' (μm)")
+                ax1.set_ylabel('Required V_rf (V)')
+                ax1.set_title('a\'=70: V_rf Requirements')
+                ax1.legend()
+                ax1.grid(True, alpha=0.3)
         
         # 2. q-parameter for a=70
-        ax2 = plt.subplot(3, 4, 2)
-        if len(df_a70) > 0:
-            scatter2 = ax2.scatter(df_a70['b_prime'], df_a70['q'], 
-                                 c=df_a70['q_feasible'], cmap='RdYlGn', s=30)
-            ax2.axhline(y=self.target_specs['q_max'], color='red', linestyle='--', 
-                       label=f'q limit ({self.target_specs["q_max"]})')
-            ax2.set_xlabel("b' (μm)")
-            ax2.set_ylabel('q-parameter')
-            ax2.set_title('a\'=70: q-parameter')
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-            plt.colorbar(scatter2, ax=ax2, label='q Feasible')
+        if 2 in panels:
+            ax2 = add_axes(2)
+            if a70_total > 0:
+                flag_panel(ax2, a70['b_prime'], a70['q'], a70['q_feasible'], 'q Feasible', s=30)
+                ax2.axhline(y=self.target_specs['q_max'], color='red', linestyle='--', 
+                           label=f'q limit ({self.target_specs["q_max"]})')
+                ax2.set_xlabel("b' (μm)")
+                ax2.set_ylabel('q-parameter')
+                ax2.set_title('a\'=70: q-parameter')
+                ax2.legend()
+                ax2.grid(True, alpha=0.3)
         
         # 3. Trap depth for a=70
-        ax3 = plt.subplot(3, 4, 3)
-        if len(df_a70) > 0:
-            scatter3 = ax3.scatter(df_a70['b_prime'], df_a70['depth'], 
-                                 c=df_a70['depth_feasible'], cmap='RdYlGn', s=30)
-            ax3.axhline(y=self.target_specs['depth_min'], color='red', linestyle='--', alpha=0.7)
-            ax3.axhline(y=self.target_specs['depth_max'], color='red', linestyle='--', alpha=0.7,
-                       label=f'Depth range ({self.target_specs["depth_min"]}-{self.target_specs["depth_max"]} eV)')
-            ax3.set_xlabel("b' (μm)")
-            ax3.set_ylabel('Trap Depth (eV)')
-            ax3.set_title('a\'=70: Trap Depth')
-            ax3.legend()
-            ax3.grid(True, alpha=0.3)
-            plt.colorbar(scatter3, ax=ax3, label='Depth Feasible')
+        if 3 in panels:
+            ax3 = add_axes(3)
+            if a70_total > 0:
+                flag_panel(ax3, a70['b_prime'], a70['depth'], a70['depth_feasible'], 'Depth Feasible', s=30)
+                ax3.axhline(y=self.target_specs['depth_min'], color='red', linestyle='--', alpha=0.7)
+                ax3.axhline(y=self.target_specs['depth_max'], color='red', linestyle='--', alpha=0.7,
+                           label=f'Depth range ({self.target_specs["depth_min"]}-{self.target_specs["depth_max"]} eV)')
+                ax3.set_xlabel("b' (μm)")
+                ax3.set_ylabel('Trap Depth (eV)')
+                ax3.set_title('a\'=70: Trap Depth')
+                ax3.legend()
+                ax3.grid(True, alpha=0.3)
         
         # 4. Overall feasibility for a=70
-        ax4 = plt.subplot(3, 4, 4)
-        if len(df_a70) > 0:
-            scatter4 = ax4.scatter(df_a70['b_prime'], df_a70['height'], 
-                                 c=df_a70['meets_criteria'], cmap='RdYlGn', s=50)
-            ax4.set_xlabel("b' (μm)")
-            ax4.set_ylabel('Height (μm)')
-            ax4.set_title('a\'=70: Overall Feasibility')
-            ax4.grid(True, alpha=0.3)
-            plt.colorbar(scatter4, ax=ax4, label='Meets All Criteria')
+        if 4 in panels:
+            ax4 = add_axes(4)
+            if a70_total > 0:
+                flag_panel(ax4, a70['b_prime'], a70['height'], a70['meets_criteria'], 'Meets All Criteria', s=50)
+                ax4.set_xlabel("b' (μm)")
+                ax4.set_ylabel('Height (μm)')
+                ax4.set_title('a\'=70: Overall Feasibility')
+                ax4.grid(True, alpha=0.3)
         
         # 5-8. Similar plots for a<70
         # 5. V_rf requirements for a<70
-        ax5 = plt.subplot(3, 4, 5)
-        if len(df_small_a) > 0:
-            scatter5 = ax5.scatter(df_small_a['a_prime'], df_small_a['V_rf_required'], 
-                                 c=df_small_a['V_rf_feasible'], cmap='RdYlGn', s=20, alpha=0.6)
-            ax5.axhline(y=self.target_specs['V_rf_max'], color='red', linestyle='--', 
-                       label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
-            ax5.set_xlabel("a' (μm)")
-            ax5.set_ylabel('Required V_rf (V)')
-            ax5.set_title('a\'<70: V_rf Requirements')
-            ax5.legend()
-            ax5.grid(True, alpha=0.3)
-            plt.colorbar(scatter5, ax=ax5, label='V_rf Feasible')
+        if 5 in panels:
+            ax5 = add_axes(5)
+            if small_a_total > 0:
+                flag_panel(ax5, small_a['a_prime'], small_a['V_rf_required'], small_a['V_rf_feasible'],
+                           'V_rf Feasible', s=20, alpha=0.6)
+                ax5.axhline(y=self.target_specs['V_rf_max'], color='red', linestyle='--', 
+                           label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
+                ax5.set_xlabel("a' (μm)")
+                ax5.set_ylabel('Required V_rf (V)')
+                ax5.set_title('a\'<70: V_rf Requirements')
+                ax5.legend()
+                ax5.grid(True, alpha=0.3)
         
         # 6. q-parameter for a<70
-        ax6 = plt.subplot(3, 4, 6)
-        if len(df_small_a) > 0:
-            scatter6 = ax6.scatter(df_small_a['a_prime'], df_small_a['q'], 
-                                 c=df_small_a['q_feasible'], cmap='RdYlGn', s=20, alpha=0.6)
-            ax6.axhline(y=self.target_specs['q_max'], color='red', linestyle='--', 
-                       label=f'q limit ({self.target_specs["q_max"]})')
-            ax6.set_xlabel("a' (μm)")
-            ax6.set_ylabel('q-parameter')
-            ax6.set_title('a\'<70: q-parameter')
-            ax6.legend()
-            ax6.grid(True, alpha=0.3)
-            plt.colorbar(scatter6, ax=ax6, label='q Feasible')
+        if 6 in panels:
+            ax6 = add_axes(6)
+            if small_a_total > 0:
+                flag_panel(ax6, small_a['a_prime'], small_a['q'], small_a['q_feasible'], 'q Feasible', s=20, alpha=0.6)
+                ax6.axhline(y=self.target_specs['q_max'], color='red', linestyle='--', 
+                           label=f'q limit ({self.target_specs["q_max"]})')
+                ax6.set_xlabel("a' (μm)")
+                ax6.set_ylabel('q-parameter')
+                ax6.set_title('a\'<70: q-parameter')
+                ax6.legend()
+                ax6.grid(True, alpha=0.3)
         
         # 7. Trap depth for a<70
-        ax7 = plt.subplot(3, 4, 7)
-        if len(df_small_a) > 0:
-            scatter7 = ax7.scatter(df_small_a['a_prime'], df_small_a['depth'], 
-                                 c=df_small_a['depth_feasible'], cmap='RdYlGn', s=20, alpha=0.6)
-            ax7.axhline(y=self.target_specs['depth_min'], color='red', linestyle='--', alpha=0.7)
-            ax7.axhline(y=self.target_specs['depth_max'], color='red', linestyle='--', alpha=0.7,
-                       label=f'Depth range ({self.target_specs["depth_min"]}-{self.target_specs["depth_max"]} eV)')
-            ax7.set_xlabel("a' (μm)")
-            ax7.set_ylabel('Trap Depth (eV)')
-            ax7.set_title('a\'<70: Trap Depth')
-            ax7.legend()
-            ax7.grid(True, alpha=0.3)
-            plt.colorbar(scatter7, ax=ax7, label='Depth Feasible')
+        if 7 in panels:
+            ax7 = add_axes(7)
+            if small_a_total > 0:
+                flag_panel(ax7, small_a['a_prime'], small_a['depth'], small_a['depth_feasible'],
+                           'Depth Feasible', s=20, alpha=0.6)
+                ax7.axhline(y=self.target_specs['depth_min'], color='red', linestyle='--', alpha=0.7)
+                ax7.axhline(y=self.target_specs['depth_max'], color='red', linestyle='--', alpha=0.7,
+                           label=f'Depth range ({self.target_specs["depth_min"]}-{self.target_specs["depth_max"]} eV)')
+                ax7.set_xlabel("a' (μm)")
+                ax7.set_ylabel('Trap Depth (eV)')
+                ax7.set_title('a\'<70: Trap Depth')
+                ax7.legend()
+                ax7.grid(True, alpha=0.3)
         
         # 8. Overall feasibility for a<70
-        ax8 = plt.subplot(3, 4, 8)
-        if len(df_small_a) > 0:
-            # Color by a' value for feasible solutions
-            feasible_mask = df_small_a['meets_criteria']
-            if feasible_mask.sum() > 0:
-                scatter8a = ax8.scatter(df_small_a[feasible_mask]['a_prime'], 
-                                      df_small_a[feasible_mask]['b_prime'], 
-                                      c=df_small_a[feasible_mask]['a_prime'], 
-                                      cmap='viridis', s=50, label='Feasible')
-            
-            # Plot infeasible solutions in gray
-            infeasible_mask = ~df_small_a['meets_criteria']
-            if infeasible_mask.sum() > 0:
-                ax8.scatter(df_small_a[infeasible_mask]['a_prime'], 
-                           df_small_a[infeasible_mask]['b_prime'], 
-                           c='lightgray', s=20, alpha=0.3, label='Infeasible')
-            
-            ax8.set_xlabel("a' (μm)")
-            ax8.set_ylabel("b' (μm)")
-            ax8.set_title('a\'<70: Feasible Solutions')
-            ax8.legend()
-            ax8.grid(True, alpha=0.3)
-            if feasible_mask.sum() > 0:
-                plt.colorbar(scatter8a, ax=ax8, label="a' (μm)")
+        if 8 in panels:
+            ax8 = add_axes(8)
+            if small_a_total > 0:
+                rasterized = small_a_total > max_points
+                
+                # Color by a' value for feasible solutions
+                if small_a_feasible > 0:
+                    scatter8a = ax8.scatter(small_a['a_prime'][small_a_feasible_mask], 
+                                          small_a['b_prime'][small_a_feasible_mask], 
+                                          c=small_a['a_prime'][small_a_feasible_mask], 
+                                          cmap='viridis', s=50, label='Feasible', rasterized=rasterized)
+                
+                # Plot infeasible solutions in gray
+                if small_a_feasible < small_a_total:
+                    ax8.scatter(small_a['a_prime'][small_a_infeasible_mask], 
+                               small_a['b_prime'][small_a_infeasible_mask], 
+                               c='lightgray', s=20, alpha=0.3, label='Infeasible', rasterized=rasterized)
+                
+                ax8.set_xlabel("a' (μm)")
+                ax8.set_ylabel("b' (μm)")
+                ax8.set_title('a\'<70: Feasible Solutions')
+                ax8.legend()
+                ax8.grid(True, alpha=0.3)
+                if small_a_feasible > 0:
+                    fig.colorbar(scatter8a, ax=ax8, label="a' (μm)")
         
         # 9-12. Summary statistics and best solutions
         # 9. Comparison statistics
-        ax9 = plt.subplot(3, 4, 9)
-        ax9.axis('off')
-        
-        # Calculate statistics
-        a70_feasible = df_a70['meets_criteria'].sum() if len(df_a70) > 0 else 0
-        a70_total = len(df_a70)
-        small_a_feasible = df_small_a['meets_criteria'].sum() if len(df_small_a) > 0 else 0
-        small_a_total = len(df_small_a)
-        
-        stats_text = "COMPARISON STATISTICS\n\n"
-        stats_text += f"a' = 70 μm:\n"
-        stats_text += f"  Feasible: {a70_feasible}/{a70_total}\n"
-        stats_text += f"  Success rate: {100*a70_feasible/max(a70_total,1):.1f}%\n\n"
-        stats_text += f"a' < 70 μm:\n"
-        stats_text += f"  Feasible: {small_a_feasible}/{small_a_total}\n"
-        stats_text += f"  Success rate: {100*small_a_feasible/max(small_a_total,1):.1f}%\n\n"
-        
-        if a70_total > 0:
-            min_vrf_a70 = df_a70['V_rf_required'].min()
-            stats_text += f"a'=70 min V_rf: {min_vrf_a70:.0f}V\n"
-        if small_a_total > 0:
-            min_vrf_small = df_small_a['V_rf_required'].min()
-            stats_text += f"a'<70 min V_rf: {min_vrf_small:.0f}V\n"
-        
-        ax9.text(0.05, 0.95, stats_text, transform=ax9.transAxes, fontsize=10,
-                verticalalignment='top', fontfamily='monospace',
-                bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.7))
+        if 9 in panels:
+            ax9 = add_axes(9)
+            ax9.axis('off')
+            
+            stats_text = "COMPARISON STATISTICS\n\n"
+            stats_text += f"a' = 70 μm:\n"
+            stats_text += f"  Feasible: {a70_feasible}/{a70_total}\n"
+            stats_text += f"  Success rate: {100*a70_feasible/max(a70_total,1):.1f}%\n\n"
+            stats_text += f"a' < 70 μm:\n"
+            stats_text += f"  Feasible: {small_a_feasible}/{small_a_total}\n"
+            stats_text += f"  Success rate: {100*small_a_feasible/max(small_a_total,1):.1f}%\n\n"
+            
+            if a70_total > 0:
+                min_vrf_a70 = a70['V_rf_required'].min()
+                stats_text += f"a'=70 min V_rf: {min_vrf_a70:.0f}V\n"
+            if small_a_total > 0:
+                min_vrf_small = small_a['V_rf_required'].min()
+                stats_text += f"a'<70 min V_rf: {min_vrf_small:.0f}V\n"
+            
+            ax9.text(0.05, 0.95, stats_text, transform=ax9.transAxes, fontsize=10,
+                    verticalalignment='top', fontfamily='monospace',
+                    bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.7))
         
         # 10. Best solutions for a<70
-        ax10 = plt.subplot(3, 4, 10)
-        ax10.axis('off')
-        
-        # Find best solutions
-        feasible_small_a = df_small_a[df_small_a['meets_criteria']]
-        if len(feasible_small_a) > 0:
-            # Sort by V_rf (lower is better)
-            best_solutions = feasible_small_a.nsmallest(10, 'V_rf_required')
+        if 10 in panels:
+            ax10 = add_axes(10)
+            ax10.axis('off')
             
-            solution_text = "BEST SOLUTIONS (a'<70)\n"
-            solution_text += "Sorted by V_rf requirement\n\n"
+            # Find best solutions
+            if small_a_feasible > 0:
+                # Sort by V_rf (lower is better)
+                feasible_index = np.flatnonzero(small_a_feasible_mask)
+                best_index = feasible_index[np.argsort(small_a['V_rf_required'][feasible_index], kind='stable')[:8]]
+                
+                solution_text = "BEST SOLUTIONS (a'<70)\n"
+                solution_text += "Sorted by V_rf requirement\n\n"
+                
+                for i, index in enumerate(best_index):
+                    solution_text += f"{i+1}. a'={small_a['a_prime'][index]:.1f}, b'={small_a['b_prime'][index]:.1f}\n"
+                    solution_text += f"   V_rf={small_a['V_rf_required'][index]:.0f}V, F_rf={small_a['F_rf'][index]:.1f}MHz\n"
+                    solution_text += f"   q={small_a['q'][index]:.3f}, depth={small_a['depth'][index]:.3f}eV\n\n"
+            else:
+                solution_text = "NO FEASIBLE SOLUTIONS\nFOUND FOR a'<70"
             
-            for i, (_, sol) in enumerate(best_solutions.iterrows()):
-                if i < 8:  # Limit display
-                    solution_text += f"{i+1}. a'={sol['a_prime']:.1f}, b'={sol['b_prime']:.1f}\n"
-                    solution_text += f"   V_rf={sol['V_rf_required']:.0f}V, F_rf={sol['F_rf']:.1f}MHz\n"
-                    solution_text += f"   q={sol['q']:.3f}, depth={sol['depth']:.3f}eV\n\n"
-        else:
-            solution_text = "NO FEASIBLE SOLUTIONS\nFOUND FOR a'<70"
-        
-        ax10.text(0.05, 0.95, solution_text, transform=ax10.transAxes, fontsize=9,
-                 verticalalignment='top', fontfamily='monospace',
-                 bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.7))
+            ax10.text(0.05, 0.95, solution_text, transform=ax10.transAxes, fontsize=9,
+                     verticalalignment='top', fontfamily='monospace',
+                     bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.7))
         
         # 11. V_rf distribution comparison
-        ax11 = plt.subplot(3, 4, 11)
-        if len(df_a70) > 0 and len(df_small_a) > 0:
-            ax11.hist(df_a70['V_rf_required'], bins=30, alpha=0.7, label='a\'=70', color='red')
-            ax11.hist(df_small_a['V_rf_required'], bins=30, alpha=0.7, label='a\'<70', color='blue')
-            ax11.axvline(x=self.target_specs['V_rf_max'], color='black', linestyle='--', 
-                        label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
-            ax11.set_xlabel('Required V_rf (V)')
-            ax11.set_ylabel('Frequency')
-            ax11.set_title('V_rf Distribution Comparison')
-            ax11.legend()
-            ax11.grid(True, alpha=0.3)
+        if 11 in panels:
+            ax11 = add_axes(11)
+            if a70_total > 0 and small_a_total > 0:
+                ax11.hist(a70['V_rf_required'], bins=30, alpha=0.7, label='a\'=70', color='red')
+                ax11.hist(small_a['V_rf_required'], bins=30, alpha=0.7, label='a\'<70', color='blue')
+                ax11.axvline(x=self.target_specs['V_rf_max'], color='black', linestyle='--', 
+                            label=f'V_rf limit ({self.target_specs["V_rf_max"]}V)')
+                ax11.set_xlabel('Required V_rf (V)')
+                ax11.set_ylabel('Frequency')
+                ax11.set_title('V_rf Distribution Comparison')
+                ax11.legend()
+                ax11.grid(True, alpha=0.3)
         
         # 12. 3D plot of feasible solutions
-        ax12 = fig.add_subplot(3, 4, 12, projection='3d')
-        if len(df_small_a) > 0:
-            feasible = df_small_a[df_small_a['meets_criteria']]
-            infeasible = df_small_a[~df_small_a['meets_criteria']]
-            
-            if len(feasible) > 0:
-                ax12.scatter(feasible['a_prime'], feasible['b_prime'], feasible['V_rf_required'],
-                           c='green', s=50, alpha=0.8, label='Feasible')
-            if len(infeasible) > 0:
-                ax12.scatter(infeasible['a_prime'], infeasible['b_prime'], infeasible['V_rf_required'],
-                           c='red', s=20, alpha=0.3, label='Infeasible')
-            
-            ax12.set_xlabel("a' (μm)")
-            ax12.set_ylabel("b' (μm)")
-            ax12.set_zlabel('V_rf (V)')
-            ax12.set_title('3D: Feasible Solutions')
-            ax12.legend()
+        if 12 in panels:
+            ax12 = add_axes(12, projection='3d')
+            if small_a_total > 0:
+                # Dense sweeps: rasterize and draw every stride-th point
+                stride = max(1, -(-small_a_total // max_points))
+                rasterized = stride > 1
+                feasible_index = np.flatnonzero(small_a_feasible_mask)[::stride]
+                infeasible_index = np.flatnonzero(small_a_infeasible_mask)[::stride]
+                
+                if len(feasible_index) > 0:
+                    ax12.scatter(small_a['a_prime'][feasible_index], small_a['b_prime'][feasible_index],
+                               small_a['V_rf_required'][feasible_index],
+                               c='green', s=50, alpha=0.8, label='Feasible', rasterized=rasterized)
+                if len(infeasible_index) > 0:
+                    ax12.scatter(small_a['a_prime'][infeasible_index], small_a['b_prime'][infeasible_index],
+                               small_a['V_rf_required'][infeasible_index],
+                               c='red', s=20, alpha=0.3, label='Infeasible', rasterized=rasterized)
+                
+                ax12.set_xlabel("a' (μm)")
+                ax12.set_ylabel("b' (μm)")
+                ax12.set_zlabel('V_rf (V)')
+                ax12.set_title('3D: Feasible Solutions')
+                ax12.legend()
         
-        plt.suptitle('Ion Trap Analysis: a\'=70 Limitations vs a\'<70 Possibilities', 
+        fig.suptitle('Ion Trap Analysis: a\'=70 Limitations vs a\'<70 Possibilities', 
                      fontsize=16, y=0.98)
-        plt.tight_layout(rect=[0, 0.02, 1, 0.96])
-        plt.show()
+        self.profiler.record('draw', time.perf_counter() - draw_start)
+        
+        with self.profiler.stage('render'):
+            fig.tight_layout(rect=[0, 0.02, 1, 0.96])
+            if output is not None:
+                fig.savefig(output)
+        if show:
+            plt.show()
         
         return df_a70, df_small_a, feasible_solutions
 
-# Example usage
-if __name__ == "__main__":
-    # Create enhanced optimizer
-    optimizer = EnhancedIonTrapOptimizer()
+def load_lookup_tables(path):
+    """
+    Read tables written by export_lookup_tables back into dense float arrays
+    Returns: (header, dict of field name -> array of shape (n_a, n_b, n_F), NaN where missing)
+    """
+    with open(os.path.join(path, 'index.json')) as f:
+        header = json.load(f)
+    
+    shape = tuple(header['axes'][axis]['n'] for axis in ('a_prime', 'b_prime', 'F_rf'))
+    dtype = '<u2' if header['encoding'] == 'uint16' else '<f2'
+    tables = {field['name']: np.full(shape, np.nan) for field in header['fields']}
+    
+    for tile in header['tiles']:
+        a_start, a_stop = tile['a_index']
+        b_start, b_stop = tile['b_index']
+        tile_shape = (a_stop - a_start, b_stop - b_start, shape[2])
+        data = np.fromfile(os.path.join(path, tile['file']), dtype=dtype)
+        
+        for k, field in enumerate(header['fields']):
+            block = data[k * np.prod(tile_shape):(k + 1) * np.prod(tile_shape)].reshape(tile_shape)
+            if header['encoding'] == 'uint16':
+                values = np.exp(block * field['scale'] + field['offset'])
+                values[block == field['missing']] = np.nan
+            else:
+                values = block.astype(float)
+            tables[field['name']][a_start:a_stop, b_start:b_stop] = values
+    
+    return header, tables
+
+class SweepStore:
+    """
+    Read-only view of a column store written by write_sweep_store
+    Physics columns are np.memmap arrays, so opening is instant and reading is zero-copy;
+    flag columns are unpacked from their bits on access. iter_chunks, summary and
+    histogram2d work chunk by chunk, for stores larger than memory.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            self.header = json.load(f)
+        
+        n_points = self.header['n_points']
+        self._columns = {}
+        for column in self.header['columns']:
+            if n_points == 0:
+                self._columns[column['name']] = np.zeros(0, dtype=column['dtype'])
+            else:
+                self._columns[column['name']] = np.memmap(os.path.join(path, column['file']), dtype=column['dtype'],
+                                                          mode='r', shape=(n_points,))
+        self._bits = {}
+        for flag in self.header['flags']:
+            n_bytes = (n_points + 7) // 8
+            self._bits[flag['name']] = (np.memmap(os.path.join(path, flag['file']), dtype=np.uint8, mode='r',
+                                                  shape=(n_bytes,)) if n_bytes else np.zeros(0, dtype=np.uint8))
+    
+    def __len__(self):
+        return self.header['n_points']
+    
+    def __getitem__(self, name):
+        return self.column(name)
+    
+    @property
+    def target_specs(self):
+        return dict(self.header['target_specs'])
+    
+    def column(self, name, start=0, stop=None):
+        """Rows [start, stop) of a column: a memmap view, or an unpacked bool array for flags"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if name in self._columns:
+            return self._columns[name][start:stop]
+        bits = self._bits[name][start // 8:(stop + 7) // 8]
+        offset = start % 8
+        return np.unpackbits(bits, count=offset + max(stop - start, 0))[offset:].view(bool)
+    
+    def columns(self, names=None, start=0, stop=None):
+        """Dict of columns (default RESULT_COLUMNS) for rows [start, stop)"""
+        return {name: self.column(name, start, stop) for name in (RESULT_COLUMNS if names is None else names)}
+    
+    def iter_chunks(self, chunk_size=None, names=None):
+        """Yield column dicts over consecutive row ranges, the written chunks by default"""
+        if chunk_size is None:
+            ranges = self.header['chunks']
+        else:
+            ranges = [(start, min(start + chunk_size, len(self))) for start in range(0, len(self), chunk_size)]
+        for start, stop in ranges:
+            yield self.columns(names, start, stop)
+    
+    def summary(self, chunk_size=1 << 22):
+        """Same counts as EnhancedIonTrapOptimizer.sweep_summary, aggregated chunk by chunk"""
+        counts = dict.fromkeys(FLAG_COLUMNS, 0)
+        min_V_rf = min_feasible_V_rf = np.inf
+        for chunk in self.iter_chunks(chunk_size, names=('V_rf_required',) + FLAG_COLUMNS):
+            for name in FLAG_COLUMNS:
+                counts[name] += int(np.count_nonzero(chunk[name]))
+            if len(chunk['V_rf_required']):
+                min_V_rf = min(min_V_rf, float(chunk['V_rf_required'].min()))
+            if chunk['meets_criteria'].any():
+                min_feasible_V_rf = min(min_feasible_V_rf, float(chunk['V_rf_required'][chunk['meets_criteria']].min()))
+        
+        return {
+            'target_specs': self.target_specs,
+            'n_points': len(self),
+            'n_feasible': counts['meets_criteria'],
+            'n_V_rf_feasible': counts['V_rf_feasible'],
+            'n_q_feasible': counts['q_feasible'],
+            'n_depth_feasible': counts['depth_feasible'],
+            'min_V_rf': min_V_rf if np.isfinite(min_V_rf) else None,
+            'min_feasible_V_rf': min_feasible_V_rf if np.isfinite(min_feasible_V_rf) else None
+        }
+    
+    def histogram2d(self, x, y, bins=200, range=None, feasible_only=False, chunk_size=1 << 22):
+        """
+        2D point-count histogram of two columns, accumulated chunk by chunk for density plots
+        range defaults to the columns' min and max. Returns (counts, x_edges, y_edges).
+        """
+        if range is None:
+            range = [(float(self._columns[name].min()), float(self._columns[name].max())) for name in (x, y)]
+        counts = None
+        names = (x, y, 'meets_criteria') if feasible_only else (x, y)
+        for chunk in self.iter_chunks(chunk_size, names=names):
+            keep = chunk['meets_criteria'] if feasible_only else slice(None)
+            part, x_edges, y_edges = np.histogram2d(chunk[x][keep], chunk[y][keep], bins=bins, range=range)
+            counts = part if counts is None else counts + part
+        if counts is None:
+            counts, x_edges, y_edges = np.histogram2d([], [], bins=bins, range=range)
+        
+        return counts, x_edges, y_edges
+    
+    def sweep_result(self):
+        """SweepResult over the stored columns (memmap-backed; its sorted indexes live in memory)"""
+        return SweepResult(self._columns, self.target_specs)
+
+class QueryService:
+    """
+    Local asyncio query service for sweep, best and feasibility queries
+    Results are cached (LRU) under a key built from the normalized query, and identical
+    queries that arrive while one is being computed wait on the same computation.
+    Compute runs in a process pool so the event loop stays responsive.
+    
+    Queries are JSON objects: {"type": "sweep" | "best" | "feasibility", "ion": "Yb-171"
+    or [N, Z], "a_range": [min, max], "b_range": [min, max], "n_a": int, "n_b": int,
+    "k": int (best only), plus any target_specs keys}. Invalid queries get a 400 reply
+    and failed computations a 500; a pool broken by a dying worker is replaced.
+    """
+    QUERY_TYPES = ('sweep', 'best', 'feasibility')
+    # Largest n_a * n_b accepted; a sweep holds about 100 * 11 * 8 bytes per geometry
+    MAX_GEOMETRIES = 100_000
+    
+    def __init__(self, workers=None, cache_size=256):
+        self.workers = workers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._executor = None
+        self._serving = False
+        self.stats = {'queries': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0}
+    
+    def normalize(self, query):
+        """
+        Validate, fill defaults and canonicalize a query; returns (params, cache key)
+        Raises ValueError, KeyError or TypeError for queries that cannot be answered, so
+        nothing invalid reaches the process pool.
+        """
+        if not isinstance(query, dict):
+            raise ValueError("query must be a JSON object")
+        if query.get('type') not in self.QUERY_TYPES:
+            raise ValueError(f"query type must be one of {self.QUERY_TYPES}")
+        
+        def number(name, default):
+            value = float(query.get(name, default))
+            if not np.isfinite(value):
+                raise ValueError(f"{name} must be finite")
+            return value
+        
+        def value_range(name, default):
+            values = query.get(name, default)
+            if not isinstance(values, (list, tuple)) or len(values) != 2:
+                raise ValueError(f"{name} must be [min, max]")
+            low, high = (float(x) for x in values)
+            if not (np.isfinite(low) and np.isfinite(high) and 0 < low <= high):
+                raise ValueError(f"{name} must be finite with 0 < min <= max")
+            return [low, high]
+        
+        def count(name, default, minimum):
+            value = query.get(name, default)
+            if isinstance(value, bool) or int(value) != value or value < minimum:
+                raise ValueError(f"{name} must be an integer >= {minimum}")
+            return int(value)
+        
+        ion = query.get('ion', 'Yb-171')
+        if isinstance(ion, str):
+            if ion not in ION_SPECIES:
+                raise ValueError(f"unknown ion species: {ion}")
+            ion = list(ION_SPECIES[ion])
+        elif not isinstance(ion, (list, tuple)) or len(ion) != 2:
+            raise ValueError("ion must be a species name or [mass number, charge]")
+        else:
+            ion = [int(ion[0]), int(ion[1])]
+            if ion[0] < 1 or ion[1] < 1:
+                raise ValueError("ion mass number and charge must be at least 1")
+        
+        defaults = EnhancedIonTrapOptimizer().target_specs
+        params = {
+            'type': query['type'],
+            'ion': ion,
+            'a_range': value_range('a_range', (50, 69)),
+            'b_range': value_range('b_range', (70, 150)),
+            'n_a': count('n_a', 20, 1),
+            'n_b': count('n_b', 30, 1),
+            'target_specs': {key: number(key, defaults[key]) for key in SPEC_KEYS}
+        }
+        if params['n_a'] * params['n_b'] > self.MAX_GEOMETRIES:
+            raise ValueError(f"n_a * n_b must be at most {self.MAX_GEOMETRIES}")
+        if params['type'] == 'best':
+            params['k'] = count('k', 10, 0)
+        
+        return params, json.dumps(params, sort_keys=True)
+    
+    async def query(self, query):
+        """Answer one query, from cache when possible"""
+        import asyncio
+        from concurrent.futures.process import BrokenProcessPool
+        
+        params, key = self.normalize(query)
+        self.stats['queries'] += 1
+        
+        if key in self._cache:
+            self.stats['cache_hits'] += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        
+        if key in self._in_flight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._in_flight[key])
+        
+        executor = self._get_executor()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(executor, _run_query, params)
+            self._in_flight[key] = future
+            try:
+                result = await asyncio.shield(future)
+            finally:
+                del self._in_flight[key]
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); later queries get a fresh pool
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        
+        self.stats['computed'] += 1
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        
+        return result
+    
+    def _get_executor(self):
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # Workers forked while the server runs would inherit open client sockets and keep
+            # those connections alive, so use a fork server where the platform has one
+            context = None
+            if self._serving and 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+    
+    async def _respond(self, reader):
+        """Read one request and return (status, payload)"""
+        import asyncio
+        
+        # A malformed request line, header, Content-Length or a truncated body gets a 400
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+        except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return 400, {'error': 'bad request'}
+        
+        if len(request_line) < 2:
+            return 400, {'error': 'bad request'}
+        if request_line[0] == 'GET' and request_line[1] == '/stats':
+            return 200, self.stats
+        if request_line[0] == 'OPTIONS':
+            return 204, None
+        if request_line[0] != 'POST' or request_line[1] != '/query':
+            return 404, {'error': 'not found'}
+        
+        try:
+            query = json.loads(body or b'{}')
+            self.normalize(query)
+        except (ValueError, KeyError, TypeError) as error:
+            return 400, {'error': str(error)}
+        
+        return 200, await self.query(query)
+    
+    async def _handle(self, reader, writer):
+        """Minimal HTTP/1.1: POST /query with a JSON body, GET /stats"""
+        try:
+            try:
+                status, payload = await self._respond(reader)
+            except Exception as error:
+                # Every request gets an answer, even when the computation fails
+                status, payload = 500, {'error': f"{type(error).__name__}: {error}"}
+            
+            data = b'' if payload is None else json.dumps(payload).encode()
+            reason = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+                      500: 'Internal Server Error'}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                f"Access-Control-Allow-Headers: Content-Type\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Run the HTTP front end until cancelled"""
+        import asyncio
+        
+        # Start the workers before the first query arrives
+        self._serving = True
+        self._get_executor().submit(int).result()
+        
+        server = await asyncio.start_server(self._handle, host, port)
+        print(f"Serving on http://{host}:{port} (POST /query, GET /stats)", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+def _run_query(params):
+    """Process-pool entry point for QueryService"""
+    optimizer = EnhancedIonTrapOptimizer(*params['ion'])
+    optimizer.target_specs.update(params['target_specs'])
+    grid = dict(a_range=tuple(params['a_range']), b_range=tuple(params['b_range']),
+                n_a=params['n_a'], n_b=params['n_b'])
+    
+    if params['type'] == 'sweep':
+        return optimizer.sweep_summary(optimizer.sweep_a_range(**grid))
+    
+    if params['type'] == 'best':
+        solutions, _ = optimizer.stream_top_solutions(max_solutions=params['k'], **grid)
+        return {'solutions': solutions}
+    
+    intervals = optimizer.solve_a_range_analytic(**grid)
+    feasible = intervals['feasible']
+    return {
+        'n_geometries': int(len(feasible)),
+        'n_feasible': int(feasible.sum()),
+        'geometries': [
+            {key: float(intervals[key][i]) for key in ('a_prime', 'b_prime', 'height', 'depth',
+                                                       'F_rf_min', 'F_rf_max', 'V_rf_opt', 'q_opt')}
+            for i in np.flatnonzero(feasible)
+        ]
+    }
+
+def _sweep_chunk(task):
+    """
+    Process-pool entry point: sweep one chunk of geometries into its slice of the shared output file
+    Returns (points written, worker pid, worker stage timings)
+    """
+    optimizer, a_prime, b_prime, F_rf_range, n_F, target_sec_freq, factors, path, layout, start, stop = task
+    columns = optimizer.sweep_geometries(a_prime, b_prime, F_rf_range=F_rf_range, n_F=n_F,
+                                         target_sec_freq=target_sec_freq, factors=factors)
+    if len(columns['a_prime']) != stop - start:
+        raise RuntimeError(f"chunk produced {len(columns['a_prime'])} points, expected {stop - start}")
+    
+    # Plain positioned writes avoid page-faulting a shared mapping in every worker
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        for key, dtype, offset in layout:
+            data = memoryview(np.ascontiguousarray(columns[key], dtype=dtype)).cast('B')
+            position = offset + start * np.dtype(dtype).itemsize
+            while len(data):
+                written = os.pwrite(fd, data, position)
+                data, position = data[written:], position + written
+    finally:
+        os.close(fd)
+    return stop - start, os.getpid(), getattr(optimizer.profiler, 'stages', {})
+
+def _tolerance_chunk(task):
+    """Process-pool entry point: evaluate one chunk of Monte Carlo tolerance samples"""
+    optimizer, nominal, sigma, n, stream, height_range, sec_freq_tol = task
+    return optimizer._tolerance_samples(nominal, sigma, n, stream, height_range=height_range,
+                                        sec_freq_tol=sec_freq_tol)
+
+def _build_parser():
+    """Command-line interface: sweep, best, plot, export, store, lut, tolerance and serve subcommands"""
+    parser = argparse.ArgumentParser(description="Surface-electrode ion trap chip parameter optimizer")
+    
+    # Grid options are added per subcommand, since argparse shares parent actions (and their defaults)
+    def grid_options(a_range=(50, 69), b_range=(70, 150), n_a=20, n_b=30):
+        grid = argparse.ArgumentParser(add_help=False)
+        grid.add_argument('--a-range', type=float, nargs=2, default=a_range, metavar=('MIN', 'MAX'), help="a' range (um)")
+        grid.add_argument('--b-range', type=float, nargs=2, default=b_range, metavar=('MIN', 'MAX'), help="b' range (um)")
+        grid.add_argument('--n-a', type=int, default=n_a, help="number of a' samples")
+        grid.add_argument('--n-b', type=int, default=n_b, help="number of b' samples")
+        return grid
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--ion', default=None, choices=sorted(ION_SPECIES), help="ion species (default Yb-171)")
+    common.add_argument('--workers', type=int, default=None, help="process-pool size for the sweep")
+    common.add_argument('--profile', action='store_true', help="print per-stage timings as JSON to stderr")
+    for key in SPEC_KEYS:
+        common.add_argument('--' + key.replace('_', '-'), dest=key, type=float, default=None,
+                            help=f"override target_specs['{key}']")
+    
+    subparsers = parser.add_subparsers(dest='command')
+    
+    sweep = subparsers.add_parser('sweep', parents=[common, grid_options()],
+                                  help="sweep a' x b' and print feasibility counts")
+    sweep.add_argument('--json', action='store_true', help="print the summary as JSON")
+    
+    best = subparsers.add_parser('best', parents=[common, grid_options()], help="lowest-V_rf feasible solutions")
+    best.add_argument('-k', '--max-solutions', type=int, default=10)
+    best.add_argument('--json', action='store_true', help="print the solutions as JSON")
+    
+    plot = subparsers.add_parser('plot', parents=[common, grid_options()], help="comprehensive a'=70 vs a'<70 figure")
+    plot.add_argument('-o', '--output', default=None, help="save to this path instead of opening a window")
+    plot.add_argument('--panels', type=int, nargs='+', default=None, help="panel numbers 1-12 to draw")
+    plot.add_argument('--max-points', type=int, default=20000, help="density rendering above this many points")
     
-    print("Enhanced Ion Trap Analysis")
-    print("=" * 50)
+    export = subparsers.add_parser('export', parents=[common, grid_options()],
+                                   help="write sweep columns to .csv or .npz")
+    export.add_argument('output', help="output path; format follows the extension")
     
-    # Run comprehensive analysis
-    df_a70, df_small_a, feasible_solutions = optimizer.visualize_comprehensive_analysis()
+    store = subparsers.add_parser('store', parents=[common, grid_options()],
+                                  help="sweep chunk by chunk into an on-disk column store")
+    store.add_argument('output', help="output directory (index.json + one file per column)")
+    store.add_argument('--n-F', type=int, default=100, help="number of F_rf samples")
+    store.add_argument('--float32', action='store_true', help="store the physics columns as float32")
+    store.add_argument('--chunk-points', type=int, default=1 << 22, help="points swept per chunk")
     
-    # Print summary
+    serve = subparsers.add_parser('serve', help="run the local HTTP query service")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, default=None, help="process-pool size")
+    serve.add_argument('--cache-size', type=int, default=256)
+    
+    # Frontend-sized defaults, matching export_lookup_tables
+    lut = subparsers.add_parser('lut', parents=[common, grid_options((30, 100), (40, 200), 71, 81)],
+                                help="write quantized lookup tables for the web frontend")
+    lut.add_argument('output', help="output directory (index.json + tile files)")
+    lut.add_argument('--n-F', type=int, default=41, help="number of F_rf samples")
+    lut.add_argument('--encoding', choices=['uint16', 'float16'], default='uint16')
+    
+    tolerance = subparsers.add_parser('tolerance', parents=[common, grid_options()],
+                                      help="Monte Carlo fabrication-tolerance check of a best solution")
+    tolerance.add_argument('--rank', type=int, default=1, help="which lowest-V_rf solution to check (1 = best)")
+    tolerance.add_argument('--samples', type=int, default=1_000_000)
+    tolerance.add_argument('--seed', type=int, default=None)
+    tolerance.add_argument('--height-range', type=float, nargs=2, default=None, metavar=('MIN', 'MAX'),
+                           help="also require the ion height in this range (um)")
+    tolerance.add_argument('--sec-freq-tol', type=float, default=None,
+                           help="also require the secular frequency within this relative tolerance")
+    for key, value in DEFAULT_TOLERANCES.items():
+        tolerance.add_argument('--sigma-' + key.replace('_', '-'), dest='sigma_' + key, type=float, default=None,
+                               help=f"1-sigma tolerance for {key} (default {value})")
+    tolerance.add_argument('--json', action='store_true', help="print the result as JSON")
+    
+    return parser
+
+def _optimizer_from_args(args):
+    """Build an optimizer with the species and spec overrides from the command line"""
+    if args.ion is None:
+        optimizer = EnhancedIonTrapOptimizer()
+    else:
+        optimizer = EnhancedIonTrapOptimizer(*ION_SPECIES[args.ion])
+    for key in SPEC_KEYS:
+        if getattr(args, key) is not None:
+            optimizer.target_specs[key] = getattr(args, key)
+    return optimizer
+
+def _print_plot_summary(optimizer, df_a70, feasible_solutions):
+    """Text summary printed after the comprehensive figure"""
     print(f"\nSUMMARY:")
     print(f"Target: secular_freq={optimizer.target_specs['secular_freq']}MHz, "
           f"q≤{optimizer.target_specs['q_max']}, V_rf≤{optimizer.target_specs['V_rf_max']}V, "
@@ -494,9 +2501,110 @@ if __name__ == "__main__":
     print(f"  a'<70: {small_a_feasible} feasible solutions")
     
     if small_a_feasible > 0:
-        best_sol = feasible_solutions[0]  # Already sorted by V_rf
+        best_sol = min(feasible_solutions, key=lambda x: x['V_rf_required'])
         print(f"\nBest solution (lowest V_rf):")
         print(f"  a'={best_sol['a_prime']:.1f}μm, b'={best_sol['b_prime']:.1f}μm")
         print(f"  V_rf={best_sol['V_rf_required']:.0f}V, F_rf={best_sol['F_rf']:.1f}MHz")
         print(f"  q={best_sol['q']:.3f}, depth={best_sol['depth']:.3f}eV")
-        print(f"  height={best_sol['height']:.1f}μm")
\ No newline at end of file
+        print(f"  height={best_sol['height']:.1f}μm")
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = _build_parser().parse_args(argv)
+    
+    if args.command is None:
+        # No subcommand: the original example run
+        args = _build_parser().parse_args(['plot'])
+    
+    if args.command == 'serve':
+        import asyncio
+        
+        service = QueryService(workers=args.workers, cache_size=args.cache_size)
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    optimizer = _optimizer_from_args(args)
+    if args.profile:
+        optimizer.profiler = SweepProfiler()
+    grid = dict(a_range=tuple(args.a_range), b_range=tuple(args.b_range), n_a=args.n_a, n_b=args.n_b)
+    
+    if args.command == 'sweep':
+        summary = optimizer.sweep_summary(optimizer.sweep_a_range(workers=args.workers, **grid))
+        if args.json:
+            print(json.dumps(summary))
+        else:
+            for key, value in summary.items():
+                print(f"{key}: {value}")
+    
+    elif args.command == 'best':
+        solutions, _ = optimizer.stream_top_solutions(max_solutions=args.max_solutions, workers=args.workers, **grid)
+        if args.json:
+            print(json.dumps(solutions))
+        else:
+            for i, sol in enumerate(solutions):
+                print(f"{i+1}. a'={sol['a_prime']:.1f}, b'={sol['b_prime']:.1f}, "
+                      f"V_rf={sol['V_rf_required']:.0f}V, F_rf={sol['F_rf']:.1f}MHz, "
+                      f"q={sol['q']:.3f}, depth={sol['depth']:.3f}eV, height={sol['height']:.1f}μm")
+    
+    elif args.command == 'plot':
+        print("Enhanced Ion Trap Analysis")
+        print("=" * 50)
+        
+        df_a70, df_small_a, feasible_solutions = optimizer.visualize_comprehensive_analysis(
+            output=args.output, panels=args.panels, max_points=args.max_points, workers=args.workers, **grid
+        )
+        _print_plot_summary(optimizer, df_a70, feasible_solutions)
+    
+    elif args.command == 'export':
+        columns = optimizer.sweep_a_range(workers=args.workers, **grid)
+        if args.output.endswith('.npz'):
+            np.savez(args.output, **columns)
+        else:
+            header = ','.join(RESULT_COLUMNS)
+            table = np.column_stack([columns[key].astype(float) for key in RESULT_COLUMNS])
+            np.savetxt(args.output, table, delimiter=',', header=header, comments='', fmt='%.10g')
+        print(f"Wrote {len(columns['a_prime'])} points to {args.output}", file=sys.stderr)
+    
+    elif args.command == 'store':
+        header = optimizer.write_sweep_store(args.output, n_F=args.n_F, dtype='float32' if args.float32 else 'float64',
+                                             chunk_points=args.chunk_points, workers=args.workers, **grid)
+        print(f"Wrote {header['n_points']} points in {len(header['chunks'])} chunks to {args.output}", file=sys.stderr)
+    
+    elif args.command == 'lut':
+        header = optimizer.export_lookup_tables(args.output, n_F=args.n_F, encoding=args.encoding, **grid)
+        n_bytes = sum(tile['bytes'] for tile in header['tiles'])
+        print(f"Wrote {len(header['tiles'])} tiles ({n_bytes} bytes) to {args.output}", file=sys.stderr)
+    
+    elif args.command == 'tolerance':
+        if args.rank < 1 or args.samples < 1:
+            print("--rank and --samples must be at least 1", file=sys.stderr)
+            return 1
+        solutions, _ = optimizer.stream_top_solutions(max_solutions=args.rank, keep_all=False, workers=args.workers, **grid)
+        if len(solutions) < args.rank:
+            print(f"Only {len(solutions)} feasible solutions found", file=sys.stderr)
+            return 1
+        tolerances = {key: getattr(args, 'sigma_' + key) for key in DEFAULT_TOLERANCES
+                      if getattr(args, 'sigma_' + key) is not None}
+        result = optimizer.tolerance_analysis(solutions[args.rank - 1], n_samples=args.samples, tolerances=tolerances,
+                                              seed=args.seed, workers=args.workers, height_range=args.height_range,
+                                              sec_freq_tol=args.sec_freq_tol)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            nominal = result['nominal']
+            print(f"a'={nominal['a_prime']:.1f}, b'={nominal['b_prime']:.1f}, "
+                  f"V_rf={nominal['V_rf']:.0f}V, F_rf={nominal['F_rf']:.1f}MHz, {result['n_samples']} samples")
+            for key, value in result.items():
+                if key.startswith('p_'):
+                    print(f"{key}: {value:.4f}")
+    
+    if args.profile:
+        print(optimizer.profiler.to_json(indent=2), file=sys.stderr)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
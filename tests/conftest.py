@@ -0,0 +1,48 @@
+"""
+Shared fixtures for the optimizer tests
+Run with: python -m pytest -q
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / 'chip-parameter.py'
+
+# The script name is not importable; register it so process pools can pickle its functions
+_spec = importlib.util.spec_from_file_location('chip_parameter', MODULE_PATH)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules['chip_parameter'] = _module
+_spec.loader.exec_module(_module)
+
+# Small (a', b') grid with a mix of feasible and infeasible points
+GRID = dict(a_range=(50, 69), b_range=(60, 150), n_a=6, n_b=9)
+
+
+@pytest.fixture(scope='session')
+def chip():
+    return _module
+
+
+@pytest.fixture(scope='session')
+def grid():
+    return dict(GRID)
+
+
+@pytest.fixture
+def optimizer():
+    return _module.EnhancedIonTrapOptimizer()
+
+
+@pytest.fixture
+def assert_columns_equal(chip):
+    """Check physics columns to rtol and feasibility flags exactly"""
+    def check(actual, expected, rtol=1e-12):
+        for key in chip.PHYSICS_COLUMNS:
+            np.testing.assert_allclose(actual[key], expected[key], rtol=rtol, err_msg=key)
+        for key in chip.FLAG_COLUMNS:
+            np.testing.assert_array_equal(actual[key], expected[key], err_msg=key)
+    return check
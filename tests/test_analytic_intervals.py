@@ -0,0 +1,35 @@
+"""Analytic feasible F_rf intervals against the sampled sweep"""
+
+import numpy as np
+
+
+def test_analytic_intervals_match_sampling(optimizer, grid):
+    columns = optimizer.sweep_a_range(**grid)
+    intervals = optimizer.solve_a_range_analytic(**grid)
+
+    # Map every sampled point to its geometry's analytic interval
+    keys = {(a, b): i for i, (a, b) in enumerate(zip(intervals['a_prime'], intervals['b_prime']))}
+    geometry = np.array([keys[a, b] for a, b in zip(columns['a_prime'], columns['b_prime'])])
+    F_rf = columns['F_rf']
+    F_rf_min = intervals['F_rf_min'][geometry]
+    F_rf_max = intervals['F_rf_max'][geometry]
+    inside = intervals['feasible'][geometry] & (F_rf_min <= F_rf) & (F_rf <= F_rf_max)
+
+    # Ignore samples sitting on an interval end, where rounding decides either way
+    margin = 1e-9 * F_rf
+    on_edge = (np.abs(F_rf - F_rf_min) < margin) | (np.abs(F_rf - F_rf_max) < margin)
+    np.testing.assert_array_equal(columns['meets_criteria'][~on_edge], inside[~on_edge])
+    np.testing.assert_allclose(columns['depth'], intervals['depth'][geometry], rtol=1e-12)
+
+    # The interval's optimum is at least as good as any sampled feasible point
+    feasible = columns['meets_criteria']
+    assert feasible.any()
+    assert intervals['feasible'][np.unique(geometry[feasible])].all()
+    assert np.all(intervals['V_rf_opt'][geometry[feasible]] <= columns['V_rf_required'][feasible] * (1 + 1e-12))
+
+
+def test_geometry_feasible_rejects_inverted_geometries(optimizer):
+    feasible = optimizer.geometry_feasible([60, 60, 80], [100, 60, 70])
+
+    assert feasible.dtype == bool
+    assert not feasible[1] and not feasible[2]
@@ -0,0 +1,76 @@
+"""Adaptive quadtree refinement of the (a', b') feasibility boundary"""
+
+import numpy as np
+import pytest
+
+A_RANGE, B_RANGE = (50, 75), (70, 150)
+
+
+@pytest.fixture(scope='module', params=[1.0, 0.5])
+def refined(request, chip):
+    optimizer = chip.EnhancedIonTrapOptimizer()
+    return optimizer, request.param, optimizer.refine_feasibility_boundary(A_RANGE, B_RANGE, tol=request.param)
+
+
+def test_cells_tile_the_domain(refined):
+    _, tol, result = refined
+    cells = result['cells']
+
+    area = sum((c['a_max'] - c['a_min']) * (c['b_max'] - c['b_min']) for c in cells)
+    assert area == pytest.approx((A_RANGE[1] - A_RANGE[0]) * (B_RANGE[1] - B_RANGE[0]))
+    for cell in cells:
+        if cell['state'] == 'boundary':
+            assert cell['a_max'] - cell['a_min'] <= tol and cell['b_max'] - cell['b_min'] <= tol
+
+
+def test_uniform_cells_match_dense_sampling(refined):
+    optimizer, _, result = refined
+    for cell in result['cells']:
+        if cell['state'] == 'boundary':
+            continue
+        a_grid, b_grid = np.meshgrid(np.linspace(cell['a_min'], cell['a_max'], 5),
+                                     np.linspace(cell['b_min'], cell['b_max'], 5))
+        expected = cell['state'] == 'feasible'
+        assert np.all(optimizer.geometry_feasible(a_grid, b_grid) == expected), cell
+
+
+def test_crossings_only_touch_boundary_cells(refined):
+    _, _, result = refined
+    points = np.concatenate(result['boundary'])
+    uniform = np.array([[c['a_min'], c['a_max'], c['b_min'], c['b_max']]
+                        for c in result['cells'] if c['state'] != 'boundary'])
+
+    # A crossing on the edge of a feasible/infeasible cell means that cell was never split
+    inside = ((uniform[:, None, 0] <= points[:, 0]) & (points[:, 0] <= uniform[:, None, 1]) &
+              (uniform[:, None, 2] <= points[:, 1]) & (points[:, 1] <= uniform[:, None, 3]))
+    assert not inside.any(), uniform[inside.any(axis=1)]
+
+
+def test_boundary_polylines_end_on_the_domain_edge(refined):
+    _, tol, result = refined
+    assert result['boundary']
+    for line in result['boundary']:
+        assert len(line) > 2
+        # Consecutive crossings lie within one finest cell
+        assert np.all(np.abs(np.diff(line, axis=0)) <= tol + 1e-9)
+        if not np.array_equal(line[0], line[-1]):
+            for a_prime, b_prime in (line[0], line[-1]):
+                assert np.isclose(a_prime, A_RANGE).any() or np.isclose(b_prime, B_RANGE).any()
+
+
+def test_crossings_lie_on_the_boundary(refined):
+    optimizer, tol, result = refined
+    points = np.concatenate(result['boundary'])
+    step = tol / 8
+
+    # Stepping off each crossing along both axes changes feasibility somewhere nearby
+    near = [optimizer.geometry_feasible(points[:, 0] + da, points[:, 1] + db)
+            for da, db in ((-step, 0), (step, 0), (0, -step), (0, step))]
+    changes = np.any(near, axis=0) & ~np.all(near, axis=0)
+    assert changes.mean() > 0.95
+
+
+def test_uses_a_fraction_of_a_uniform_grid(refined):
+    _, tol, result = refined
+    uniform = (int((A_RANGE[1] - A_RANGE[0]) / tol) + 1) * (int((B_RANGE[1] - B_RANGE[0]) / tol) + 1)
+    assert result['n_evaluations'] < 0.5 * uniform
@@ -0,0 +1,40 @@
+"""Command-line entry point"""
+
+import json
+
+import pytest
+
+GRID_ARGS = ['--a-range', '50', '69', '--b-range', '60', '150', '--n-a', '6', '--n-b', '9']
+
+
+def test_unknown_ion_is_a_usage_error(chip, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        chip.main(['sweep', '--ion', 'Foo'])
+
+    assert exit_info.value.code == 2
+    assert "invalid choice: 'Foo'" in capsys.readouterr().err
+
+
+def test_sweep_json_uses_ion_and_grid(chip, grid, capsys):
+    assert chip.main(['sweep', '--ion', 'Ca-40', '--json'] + GRID_ARGS) in (None, 0)
+
+    optimizer = chip.EnhancedIonTrapOptimizer(*chip.ION_SPECIES['Ca-40'])
+    expected = optimizer.sweep_summary(optimizer.sweep_a_range(**grid))
+    assert json.loads(capsys.readouterr().out) == json.loads(json.dumps(expected))
+
+
+def test_best_json_matches_streaming_search(chip, optimizer, grid, capsys):
+    assert chip.main(['best', '-k', '3', '--json'] + GRID_ARGS) in (None, 0)
+
+    expected, _ = optimizer.stream_top_solutions(max_solutions=3, **grid)
+    assert json.loads(capsys.readouterr().out) == expected
+
+
+
+def test_lut_has_its_own_grid_defaults(chip):
+    parser = chip._build_parser()
+
+    lut = parser.parse_args(['lut', 'out'])
+    sweep = parser.parse_args(['sweep'])
+    assert (tuple(lut.a_range), tuple(lut.b_range), lut.n_a, lut.n_b) == ((30, 100), (40, 200), 71, 81)
+    assert (tuple(sweep.a_range), tuple(sweep.b_range), sweep.n_a, sweep.n_b) == ((50, 69), (70, 150), 20, 30)
@@ -0,0 +1,44 @@
+"""Inverse geometry solver round-tripped through the forward formulas"""
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('branch', ['low', 'high'])
+def test_solution_reproduces_height_and_frequency(chip, branch):
+    optimizer = chip.EnhancedIonTrapOptimizer(40, 2)
+    height, F_rf = np.meshgrid(np.linspace(40, 120, 9), np.linspace(15, 45, 7), indexing='ij')
+
+    solution = optimizer.solve_geometry(height, F_rf, V_rf=200, secular_freq=2.0, branch=branch)
+    solved = solution['solved']
+    assert solved.any()
+
+    a_prime, b_prime = solution['a_prime'][solved], solution['b_prime'][solved]
+    assert np.all(b_prime > a_prime)
+    np.testing.assert_allclose(optimizer.calculate_trap_height(a_prime, b_prime), height[solved], rtol=1e-10)
+    np.testing.assert_allclose(optimizer.calculate_secular_frequency(a_prime, b_prime, 200, F_rf[solved]),
+                               2.0, rtol=1e-9)
+    np.testing.assert_allclose(solution['depth'][solved],
+                               optimizer.calculate_trap_depth(a_prime, b_prime, 200, F_rf[solved]), rtol=1e-12)
+
+
+def test_branches_straddle_the_peak_ratio(optimizer):
+    low = optimizer.solve_geometry(80, 20, branch='low')
+    high = optimizer.solve_geometry(80, 20, branch='high')
+    peak = 3 + 2 * np.sqrt(2)
+
+    assert low['solved'] and high['solved']
+    assert low['b_prime'] / low['a_prime'] <= peak <= high['b_prime'] / high['a_prime']
+
+
+def test_unreachable_target_is_not_solved(optimizer):
+    # Far too little voltage for this frequency at any aspect ratio
+    solution = optimizer.solve_geometry([80, 80], [20, 20], V_rf=[250, 1e-3])
+
+    assert solution['solved'].tolist() == [True, False]
+    assert np.isnan(solution['a_prime'][1]) and np.isnan(solution['V_rf_required'][1])
+
+
+def test_unknown_branch_raises(optimizer):
+    with pytest.raises(ValueError):
+        optimizer.solve_geometry(80, 20, branch='middle')
@@ -0,0 +1,40 @@
+"""Lookup tables for the web frontend: export and load round-trip"""
+
+import numpy as np
+import pytest
+
+LUT_GRID = dict(a_range=(30, 100), b_range=(40, 200), F_rf_range=(10, 50), n_a=15, n_b=17, n_F=5, tile_size=8)
+
+
+def expected_tables(optimizer):
+    a_values = np.linspace(*LUT_GRID['a_range'], LUT_GRID['n_a'])
+    b_values = np.linspace(*LUT_GRID['b_range'], LUT_GRID['n_b'])
+    F_values = np.linspace(*LUT_GRID['F_rf_range'], LUT_GRID['n_F'])
+    a_prime, b_prime, F_rf = np.meshgrid(a_values, b_values, F_values, indexing='ij')
+    # The a' = b' points divide by zero; they are masked out below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        V_rf, q = optimizer.required_vrf_array(a_prime, b_prime, optimizer.target_specs['secular_freq'], F_rf)
+        depth = optimizer.calculate_trap_depth(a_prime, b_prime, V_rf, F_rf)
+    usable = (b_prime > a_prime) & (V_rf > 0)
+    tables = {'V_rf_required': V_rf, 'q': np.broadcast_to(q, V_rf.shape), 'depth': depth}
+    return usable, {key: np.where(usable, value, np.nan) for key, value in tables.items()}
+
+
+@pytest.mark.parametrize('encoding, rtol', [('uint16', 2e-4), ('float16', 1e-3)])
+def test_round_trip(chip, optimizer, tmp_path, encoding, rtol):
+    header = optimizer.export_lookup_tables(tmp_path, encoding=encoding, **LUT_GRID)
+    loaded_header, tables = chip.load_lookup_tables(tmp_path)
+    usable, expected = expected_tables(optimizer)
+
+    assert loaded_header == header
+    # Partial tiles at the high a' and b' ends, and no file for tiles entirely in b' <= a'
+    assert {tuple(tile['a_index']) for tile in header['tiles']} == {(0, 8), (8, 15)}
+    for name, values in expected.items():
+        np.testing.assert_array_equal(np.isnan(tables[name]), ~usable, err_msg=name)
+        finite = usable & np.isfinite(tables[name])
+        np.testing.assert_allclose(tables[name][finite], values[finite], rtol=rtol, err_msg=name)
+
+
+def test_unknown_encoding_raises(optimizer, tmp_path):
+    with pytest.raises(ValueError):
+        optimizer.export_lookup_tables(tmp_path, encoding='int8', **LUT_GRID)
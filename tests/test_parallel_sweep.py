@@ -0,0 +1,45 @@
+"""Process-pool sweeps against the serial engine"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def test_parallel_sweep_matches_serial(optimizer, grid, assert_columns_equal):
+    serial = optimizer.sweep_a_range(**grid)
+    parallel = optimizer.sweep_a_range(workers=2, **grid)
+
+    assert_columns_equal(parallel, serial)
+
+
+def test_shared_executor_and_factors(optimizer, grid, assert_columns_equal):
+    a_grid, b_grid = np.meshgrid(np.linspace(*grid['a_range'], grid['n_a']),
+                                 np.linspace(*grid['b_range'], grid['n_b']), indexing='ij')
+    serial = optimizer.sweep_geometries(a_grid, b_grid)
+    factors = optimizer.geometry_factors(a_grid.ravel(), b_grid.ravel())
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for _ in range(2):
+            parallel = optimizer.sweep_parallel(a_grid, b_grid, workers=2, factors=factors, executor=executor)
+            assert_columns_equal(parallel, serial)
+
+
+def test_small_dev_shm_falls_back_to_temp_dir(optimizer, grid, assert_columns_equal, monkeypatch):
+    directories = []
+    mkstemp = tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        directories.append(kwargs.get('dir'))
+        return mkstemp(*args, **kwargs)
+
+    # Report a nearly full /dev/shm
+    monkeypatch.setattr(tempfile, 'mkstemp', recording_mkstemp)
+    monkeypatch.setattr(os, 'statvfs', lambda path: SimpleNamespace(f_bavail=1, f_frsize=4096))
+
+    parallel = optimizer.sweep_a_range(workers=2, **grid)
+
+    assert directories == [None]
+    assert_columns_equal(parallel, optimizer.sweep_a_range(**grid))
@@ -0,0 +1,43 @@
+"""Pareto-front extraction against brute-force dominance checks"""
+
+import numpy as np
+import pytest
+
+
+def brute_force_front(values):
+    """Rows not weakly dominated by another row; among equal rows the first is kept"""
+    keep = []
+    for i, row in enumerate(values):
+        no_worse = np.all(values <= row, axis=1)
+        better = np.any(values < row, axis=1) | (np.arange(len(values)) < i)
+        if not np.any(no_worse & better):
+            keep.append(i)
+    return np.array(keep, dtype=int)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3, 4])
+@pytest.mark.parametrize('block_size', [7, 512])
+def test_front_matches_brute_force(chip, k, block_size):
+    rng = np.random.default_rng(k)
+    # Small integer values force plenty of ties and duplicate rows
+    values = rng.integers(0, 12, size=(400, k)).astype(float)
+
+    front = chip.pareto_front_indices(values, block_size=block_size)
+
+    np.testing.assert_array_equal(np.sort(front), brute_force_front(values))
+
+
+def test_empty_input(chip):
+    assert len(chip.pareto_front_indices(np.zeros((0, 3)))) == 0
+
+
+def test_sweep_front_matches_brute_force(chip, optimizer, grid):
+    columns = optimizer.sweep_a_range(**grid)
+    front = optimizer.pareto_front(columns)
+
+    feasible = np.flatnonzero(columns['meets_criteria'])
+    values = np.column_stack([columns[name][feasible] * (1 if sense == 'min' else -1)
+                              for name, sense in chip.PARETO_OBJECTIVES.items()])
+    expected = feasible[brute_force_front(values)]
+    assert len(front['a_prime']) == len(expected)
+    np.testing.assert_array_equal(np.sort(front['V_rf_required']), np.sort(columns['V_rf_required'][expected]))
@@ -0,0 +1,42 @@
+"""Stage profiling of serial and parallel sweeps"""
+
+import tracemalloc
+
+import numpy as np
+
+SWEEP_STAGES = {'geometry', 'vrf_solve', 'depth', 'feasibility'}
+
+
+def profiled_sweep(chip, grid, **kwargs):
+    optimizer = chip.EnhancedIonTrapOptimizer()
+    optimizer.profiler = chip.SweepProfiler()
+    columns = optimizer.sweep_a_range(**grid, **kwargs)
+    return columns, optimizer.profiler.report()
+
+
+def test_parallel_report_matches_serial(chip, grid):
+    columns, serial = profiled_sweep(chip, grid)
+    _, parallel = profiled_sweep(chip, grid, workers=2)
+
+    assert set(serial['stages']) == SWEEP_STAGES
+    assert set(parallel['stages']) == SWEEP_STAGES | {'pool_overhead'}
+    assert parallel['counters'] == serial['counters']
+    assert serial['counters']['points'] == len(columns['a_prime'])
+    assert serial['counters']['feasible'] == np.count_nonzero(columns['meets_criteria'])
+    # One call per worker chunk
+    assert all(parallel['stages'][name]['calls'] > 1 for name in SWEEP_STAGES)
+
+
+def test_memory_tracing_is_stopped_after_a_stage(chip):
+    profiler = chip.SweepProfiler(trace_memory=True)
+    with profiler.stage('outer'):
+        with profiler.stage('inner'):
+            data = np.ones(2**20)
+        del data
+
+    assert not tracemalloc.is_tracing()
+    report = profiler.report()
+    # The outer stage's peak includes what was allocated inside the inner one
+    assert report['stages']['inner']['peak_traced_mib'] >= 8
+    assert report['stages']['outer']['peak_traced_mib'] >= report['stages']['inner']['peak_traced_mib']
+
@@ -0,0 +1,142 @@
+"""Local query service: caching, coalescing, validation and error responses"""
+
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+QUERY = {'type': 'sweep', 'n_a': 5, 'n_b': 6}
+
+
+@pytest.fixture
+def service(chip):
+    service = chip.QueryService(workers=1, cache_size=2)
+    yield service
+    service.close()
+
+
+def test_repeated_query_is_a_cache_hit(chip, service):
+    async def run():
+        first = await service.query(QUERY)
+        # Same query with a default spelled out and keys reordered
+        second = await service.query({'n_b': 6, 'ion': 'Yb-171', **QUERY})
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    params, _ = service.normalize(QUERY)
+    assert first == second == chip._run_query(params)
+    assert service.stats == {'queries': 2, 'cache_hits': 1, 'coalesced': 0, 'computed': 1}
+
+
+def test_concurrent_identical_queries_are_coalesced(service):
+    async def run():
+        return await asyncio.gather(*(service.query(QUERY) for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert results[0] == results[1] == results[2]
+    assert service.stats == {'queries': 3, 'cache_hits': 0, 'coalesced': 2, 'computed': 1}
+
+
+def test_cache_evicts_least_recently_used(service):
+    queries = [dict(QUERY, n_a=n) for n in (3, 4, 5)]
+
+    async def run():
+        for query in queries:
+            await service.query(query)
+        await service.query(queries[0])
+
+    asyncio.run(run())
+
+    assert service.stats['computed'] == 4 and service.stats['cache_hits'] == 0
+
+
+def test_broken_pool_is_replaced(service):
+    # A worker that dies takes the whole pool down
+    with pytest.raises(BrokenProcessPool):
+        service._get_executor().submit(os._exit, 1).result()
+
+    async def run():
+        with pytest.raises(BrokenProcessPool):
+            await service.query(QUERY)
+        return await service.query(QUERY)
+
+    assert asyncio.run(run())['n_points'] > 0
+
+
+@pytest.mark.parametrize('query', [
+    [1],
+    {'type': 'nearest'},
+    {'type': 'sweep', 'a_range': [1]},
+    {'type': 'sweep', 'b_range': [70, 'x']},
+    {'type': 'sweep', 'a_range': [60, 50]},
+    {'type': 'sweep', 'n_a': 0},
+    {'type': 'sweep', 'n_a': 2.5},
+    {'type': 'sweep', 'n_a': 1000, 'n_b': 1000},
+    {'type': 'sweep', 'q_max': 'nan'},
+    {'type': 'sweep', 'ion': 'Foo'},
+    {'type': 'sweep', 'ion': [40]},
+    {'type': 'best', 'k': -1},
+])
+def test_invalid_queries_are_rejected(service, query):
+    with pytest.raises((ValueError, KeyError, TypeError)):
+        service.normalize(query)
+
+
+def http(service, request):
+    """Send one raw request to a server running service._handle; returns (status, payload)"""
+    async def run():
+        server = await asyncio.start_server(service._handle, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request)
+            await writer.drain()
+            # The client is done sending; truncated requests must not wait for more
+            writer.write_eof()
+            response = await asyncio.wait_for(reader.read(), timeout=30)
+            writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body) if body else None
+
+    return asyncio.run(run())
+
+
+def post(body):
+    return b'POST /query HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+
+
+@pytest.mark.parametrize('request_bytes', [
+    post(b'[1]'),
+    post(b'{"type": "sweep", "a_range": [1]}'),
+    post(b'{"type": "best", "k": -1}'),
+    post(b'not json'),
+    b'POST /query HTTP/1.1\r\nContent-Length: abc\r\n\r\n',
+    b'POST /query HTTP/1.1\r\nContent-Length: 100\r\n\r\n{"type"',
+    b'\r\n',
+])
+def test_malformed_requests_get_400(service, request_bytes):
+    status, payload = http(service, request_bytes)
+
+    assert status == 400
+    assert 'error' in payload
+    # Nothing reached the pool
+    assert service._executor is None
+
+
+def test_failed_computation_gets_500(service, monkeypatch):
+    async def failing(query):
+        raise RuntimeError('worker crashed')
+
+    monkeypatch.setattr(service, 'query', failing)
+    status, payload = http(service, post(json.dumps(QUERY).encode()))
+
+    assert status == 500
+    assert 'worker crashed' in payload['error']
+
+
+def test_stats_and_unknown_paths(service):
+    assert http(service, b'GET /stats HTTP/1.1\r\n\r\n') == (200, service.stats)
+    assert http(service, b'GET /nowhere HTTP/1.1\r\n\r\n')[0] == 404
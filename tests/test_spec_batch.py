@@ -0,0 +1,52 @@
+"""Batch what-if evaluation of target_specs against one sweep per spec"""
+
+import numpy as np
+import pytest
+
+SPECS = [
+    {},
+    {'q_max': 0.3, 'V_rf_max': 250},
+    {'secular_freq': 2.0, 'depth_min': 0.05},
+    {'secular_freq': 3.0, 'depth_max': 0.5},
+    {'V_rf_max': 1.0}
+]
+
+
+def test_batch_matches_separate_sweeps(chip, grid):
+    optimizer = chip.EnhancedIonTrapOptimizer()
+    table = optimizer.evaluate_spec_batch(SPECS, **grid)
+
+    for row, changes in enumerate(SPECS):
+        reference = chip.EnhancedIonTrapOptimizer()
+        reference.target_specs.update(changes)
+        columns = reference.sweep_a_range(**grid)
+        feasible = np.flatnonzero(columns['meets_criteria'])
+
+        assert table['n_feasible'][row] == len(feasible)
+        if len(feasible) == 0:
+            assert np.isnan(table['best_V_rf_required'][row])
+            continue
+        best = feasible[np.argmin(columns['V_rf_required'][feasible])]
+        for key in chip.PHYSICS_COLUMNS:
+            assert table['best_' + key][row] == pytest.approx(columns[key][best], rel=1e-12), key
+
+
+def test_array_input_matches_dicts(chip, optimizer, grid):
+    array = np.array([[{**optimizer.target_specs, **spec}[key] for key in chip.SPEC_KEYS] for spec in SPECS])
+
+    from_array = optimizer.evaluate_spec_batch(array, **grid)
+    from_dicts = optimizer.evaluate_spec_batch(SPECS, **grid)
+
+    for key, value in from_dicts.items():
+        np.testing.assert_array_equal(from_array[key], value, err_msg=key)
+
+
+@pytest.mark.parametrize('shape', [(5, 4), (5,), (2, 5, 1)])
+def test_wrong_array_shape_raises(optimizer, grid, shape):
+    with pytest.raises(ValueError):
+        optimizer.evaluate_spec_batch(np.ones(shape), **grid)
+
+
+def test_unknown_key_raises(optimizer, grid):
+    with pytest.raises(KeyError):
+        optimizer.evaluate_spec_batch([{'qmax': 0.3}], **grid)
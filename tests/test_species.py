@@ -0,0 +1,30 @@
+"""Multi-species sweep against separate per-species optimizers"""
+
+import numpy as np
+
+
+def test_species_sweep_matches_separate_optimizers(chip, optimizer, grid, assert_columns_equal):
+    species = ['Yb-171', 'Ca-40', (40, 2), 'Be-9']
+    columns = optimizer.sweep_species(species, **grid)
+    n_points = len(columns['a_prime']) // len(species)
+
+    for i, entry in enumerate(species):
+        mass_number, charge = chip.ION_SPECIES[entry] if isinstance(entry, str) else entry
+        reference = chip.EnhancedIonTrapOptimizer(mass_number, charge).sweep_a_range(**grid)
+        part = {key: value[i * n_points:(i + 1) * n_points] for key, value in columns.items()}
+        assert_columns_equal(part, reference)
+        assert np.all(part['ion_mass_number'] == mass_number)
+        assert np.all(part['ion_charge'] == charge)
+
+
+def test_charge_scales_required_voltage(chip):
+    single = chip.EnhancedIonTrapOptimizer(40, 1)
+    double = chip.EnhancedIonTrapOptimizer(40, 2)
+
+    # V_rf ~ mass / charge at a fixed secular frequency, and the depth then depends on mass only
+    V_single, _ = single.required_vrf_array(60, 100, 2.5, 30)
+    V_double, _ = double.required_vrf_array(60, 100, 2.5, 30)
+    assert np.isclose(V_double, V_single / 2, rtol=1e-12)
+    assert np.isclose(double.calculate_secular_frequency(60, 100, V_double, 30), 2.5, rtol=1e-12)
+    assert np.isclose(double.calculate_trap_depth(60, 100, V_double, 30),
+                      single.calculate_trap_depth(60, 100, V_single, 30), rtol=1e-12)
@@ -0,0 +1,58 @@
+"""Vectorized sweep engine against point-by-point loops over the scalar methods"""
+
+import numpy as np
+
+
+def scalar_sweep(optimizer, a_range, b_range, n_a, n_b):
+    """Point-by-point reference built only from the scalar methods"""
+    specs = optimizer.target_specs
+    rows = []
+    for a_prime in np.linspace(a_range[0], a_range[1], n_a):
+        for b_prime in np.linspace(b_range[0], b_range[1], n_b):
+            if b_prime <= a_prime:
+                continue
+            for sol in optimizer.find_required_vrf_for_secular_freq(a_prime, b_prime, specs['secular_freq']):
+                V_rf = sol['V_rf_required']
+                if V_rf <= 0:
+                    continue
+                q = optimizer.calculate_q_parameter(a_prime, b_prime, V_rf, sol['F_rf'])
+                depth = optimizer.calculate_trap_depth(a_prime, b_prime, V_rf, sol['F_rf'])
+                rows.append({
+                    'a_prime': a_prime,
+                    'b_prime': b_prime,
+                    'height': optimizer.calculate_trap_height(a_prime, b_prime),
+                    'F_rf': sol['F_rf'],
+                    'V_rf_required': V_rf,
+                    'q': q,
+                    'depth': depth,
+                    'V_rf_feasible': V_rf <= specs['V_rf_max'],
+                    'q_feasible': q <= specs['q_max'],
+                    'depth_feasible': specs['depth_min'] <= depth <= specs['depth_max']
+                })
+    return rows
+
+
+def test_vectorized_sweep_matches_scalar_loops(chip, optimizer, grid):
+    rows = scalar_sweep(optimizer, **grid)
+    columns = optimizer.sweep_a_range(**grid)
+
+    assert len(columns['a_prime']) == len(rows)
+    for key in chip.PHYSICS_COLUMNS:
+        np.testing.assert_allclose(columns[key], [row[key] for row in rows], rtol=1e-9, err_msg=key)
+    for key in ('V_rf_feasible', 'q_feasible', 'depth_feasible'):
+        np.testing.assert_array_equal(columns[key], [row[key] for row in rows], err_msg=key)
+    np.testing.assert_array_equal(
+        columns['meets_criteria'],
+        [row['V_rf_feasible'] and row['q_feasible'] and row['depth_feasible'] for row in rows]
+    )
+
+
+def test_records_match_columns(chip, optimizer, grid):
+    columns = optimizer.sweep_a_range(**grid)
+    records = chip.columns_to_records(columns)
+
+    assert len(records) == len(columns['a_prime'])
+    assert set(records[0]) == set(chip.RESULT_COLUMNS)
+    for i in (0, len(records) // 2, len(records) - 1):
+        for key in chip.RESULT_COLUMNS:
+            assert records[i][key] == columns[key][i]
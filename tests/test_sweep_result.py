@@ -0,0 +1,86 @@
+"""SweepResult re-evaluation against fresh sweeps and brute-force filters"""
+
+import numpy as np
+import pytest
+
+CHANGES = [
+    {},
+    {'q_max': 0.3, 'V_rf_max': 250, 'depth_min': 0.05},
+    {'secular_freq': 2.2, 'depth_max': 0.2},
+    {'V_rf_max': 1.0}
+]
+
+
+@pytest.fixture(scope='module')
+def result(chip, grid):
+    return chip.EnhancedIonTrapOptimizer().sweep_result(**grid)
+
+
+@pytest.mark.parametrize('changes', CHANGES)
+def test_update_specs_matches_fresh_sweep(chip, grid, result, changes, assert_columns_equal):
+    result.update_specs(**{**chip.EnhancedIonTrapOptimizer().target_specs, **changes})
+
+    fresh = chip.EnhancedIonTrapOptimizer()
+    fresh.target_specs.update(changes)
+    expected = fresh.sweep_a_range(**grid)
+
+    assert_columns_equal({key: result.column(key) for key in chip.PHYSICS_COLUMNS + chip.FLAG_COLUMNS}, expected)
+    np.testing.assert_array_equal(result.feasible_index(), np.flatnonzero(expected['meets_criteria']))
+    counts = result.counts()
+    assert counts['n_feasible'] == np.count_nonzero(expected['meets_criteria'])
+    for key in ('V_rf_feasible', 'q_feasible', 'depth_feasible'):
+        assert counts[f'n_{key}'] == np.count_nonzero(expected[key])
+
+
+@pytest.mark.parametrize('k', [-1, 0, 1, 7, 10**6])
+def test_best_matches_brute_force(chip, result, k):
+    result.update_specs(**chip.EnhancedIonTrapOptimizer().target_specs)
+    feasible = np.flatnonzero(result['meets_criteria'])
+    order = feasible[np.argsort(result['V_rf_required'][feasible], kind='stable')]
+
+    assert result.best(k) == result.records(order[:max(k, 0)])
+
+
+def test_unknown_spec_key_raises(result):
+    with pytest.raises(KeyError):
+        result.update_specs(qmax=0.3)
+
+
+RANGES = [
+    {'height': (60, 70)},
+    {'height': (60, None), 'V_rf_required': (None, 200)},
+    {'q': (0.1, 0.2), 'depth': (0.05, 0.5), 'F_rf': (20, 30)},
+    {'a_prime': (100, None)}
+]
+
+
+@pytest.mark.parametrize('ranges', RANGES)
+@pytest.mark.parametrize('feasible_only', [False, True])
+def test_query_matches_brute_force(chip, result, ranges, feasible_only):
+    result.update_specs(**{**chip.EnhancedIonTrapOptimizer().target_specs, 'secular_freq': 2.2})
+    keep = result['meets_criteria'].copy() if feasible_only else np.ones(len(result), dtype=bool)
+    for name, (low, high) in ranges.items():
+        values = result[name]
+        keep &= (values >= (-np.inf if low is None else low)) & (values <= (np.inf if high is None else high))
+
+    np.testing.assert_array_equal(result.query_index(feasible_only, **ranges), np.flatnonzero(keep))
+    assert result.query(feasible_only, **ranges) == result.records(np.flatnonzero(keep))
+
+
+@pytest.mark.parametrize('feasible_only', [False, True])
+def test_nearest_matches_brute_force(chip, result, feasible_only):
+    result.update_specs(**chip.EnhancedIonTrapOptimizer().target_specs)
+    target = {'height': 63.3, 'F_rf': 27.1}
+    candidates = np.flatnonzero(result['meets_criteria']) if feasible_only else np.arange(len(result))
+    spans = {name: np.ptp(result[name]) for name in target}
+    distance = sum(((result[name][candidates] - value) / spans[name])**2 for name, value in target.items())
+
+    index = result.nearest_index(target, k=5, feasible_only=feasible_only)
+
+    np.testing.assert_array_equal(index, candidates[np.argsort(distance, kind='stable')[:5]])
+    assert len(result.nearest_index(target, k=0)) == 0
+
+
+def test_query_unknown_column_raises(result):
+    with pytest.raises(KeyError):
+        result.query_index(heigth=(60, 70))
@@ -0,0 +1,63 @@
+"""On-disk column store against an in-memory sweep"""
+
+import numpy as np
+import pytest
+
+# 7 F_rf samples and 3 geometries per chunk: chunk sizes are not multiples of 8 bits
+STORE_GRID = dict(a_range=(50, 69), b_range=(60, 150), n_a=6, n_b=9, n_F=7, chunk_points=21)
+
+
+@pytest.fixture(scope='module')
+def reference(chip):
+    grid = {key: value for key, value in STORE_GRID.items() if key not in ('n_F', 'chunk_points')}
+    a_grid, b_grid = np.meshgrid(np.linspace(*grid['a_range'], grid['n_a']),
+                                 np.linspace(*grid['b_range'], grid['n_b']), indexing='ij')
+    return chip.EnhancedIonTrapOptimizer().sweep_geometries(a_grid, b_grid, n_F=STORE_GRID['n_F'])
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_store_matches_sweep(chip, optimizer, tmp_path, reference, assert_columns_equal, workers):
+    header = optimizer.write_sweep_store(tmp_path, workers=workers, **STORE_GRID)
+    store = chip.SweepStore(tmp_path)
+
+    assert len(store) == header['n_points'] == len(reference['a_prime'])
+    assert len(header['chunks']) > 3 and any(stop % 8 for _, stop in header['chunks'])
+    assert_columns_equal(store.columns(), reference)
+
+
+def test_slices_across_byte_and_chunk_boundaries(chip, optimizer, tmp_path, reference):
+    optimizer.write_sweep_store(tmp_path, **STORE_GRID)
+    store = chip.SweepStore(tmp_path)
+    n = len(store)
+
+    for start, stop in [(0, 1), (3, 5), (7, 9), (5, 30), (13, n), (n - 3, n + 10), (n, n)]:
+        for name in chip.RESULT_COLUMNS:
+            np.testing.assert_array_equal(store.column(name, start, stop), reference[name][start:stop], err_msg=name)
+
+    chunks = list(store.iter_chunks(13, names=chip.FLAG_COLUMNS))
+    for name in chip.FLAG_COLUMNS:
+        np.testing.assert_array_equal(np.concatenate([chunk[name] for chunk in chunks]), reference[name])
+
+
+def test_summary_histogram_and_sweep_result(chip, optimizer, tmp_path, reference):
+    optimizer.write_sweep_store(tmp_path, **STORE_GRID)
+    store = chip.SweepStore(tmp_path)
+
+    assert store.summary(chunk_size=10) == optimizer.sweep_summary(reference)
+
+    counts, x_edges, y_edges = store.histogram2d('height', 'V_rf_required', bins=5, feasible_only=True, chunk_size=10)
+    feasible = reference['meets_criteria']
+    expected, _, _ = np.histogram2d(reference['height'][feasible], reference['V_rf_required'][feasible],
+                                    bins=[x_edges, y_edges])
+    np.testing.assert_array_equal(counts, expected)
+
+    assert store.sweep_result().counts()['n_feasible'] == np.count_nonzero(feasible)
+
+
+def test_float32_store(chip, optimizer, tmp_path, reference):
+    optimizer.write_sweep_store(tmp_path, dtype='float32', **STORE_GRID)
+    store = chip.SweepStore(tmp_path)
+
+    assert store['V_rf_required'].dtype == np.dtype('<f4')
+    np.testing.assert_allclose(store['V_rf_required'], reference['V_rf_required'], rtol=1e-6)
+    np.testing.assert_array_equal(store['meets_criteria'], reference['meets_criteria'])
@@ -0,0 +1,49 @@
+"""Monte Carlo fabrication-tolerance analysis"""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def candidate(chip, grid):
+    return chip.EnhancedIonTrapOptimizer().sweep_result(**grid).best(1)[0]
+
+
+def test_workers_give_the_same_result(optimizer, candidate):
+    kwargs = dict(n_samples=50_000, seed=7, chunk_size=8192, height_range=(60, 80), sec_freq_tol=0.05)
+
+    serial = optimizer.tolerance_analysis(candidate, **kwargs)
+    parallel = optimizer.tolerance_analysis(candidate, workers=2, **kwargs)
+
+    assert parallel == serial
+
+
+def test_zero_tolerances_reproduce_the_nominal_point(optimizer, candidate):
+    tolerances = {key: 0.0 for key in ('a_prime', 'b_prime', 'V_rf', 'F_rf', 'correction')}
+    result = optimizer.tolerance_analysis(candidate, n_samples=1000, tolerances=tolerances, seed=1)
+
+    assert result['p_meets_criteria'] == 1.0
+    for name in ('height', 'q', 'depth'):
+        assert result[name]['mean'] == pytest.approx(candidate[name], rel=1e-12)
+        # The std comes from sums of squares, so it is zero only up to cancellation
+        assert result[name]['std'] <= 1e-6 * abs(candidate[name])
+    assert result['secular_freq']['mean'] == pytest.approx(optimizer.target_specs['secular_freq'], rel=1e-12)
+
+
+def test_probabilities_match_the_sample_fraction(optimizer, candidate):
+    # The seed fixes the samples; one chunk holding every sample makes them easy to rebuild
+    result = optimizer.tolerance_analysis(candidate, n_samples=20_000, seed=3, chunk_size=20_000)
+    stream = np.random.SeedSequence(3).spawn(1)[0]
+    part = optimizer._tolerance_samples(result['nominal'], result['tolerances'], 20_000, stream)
+
+    assert result['p_meets_criteria'] == part['counts']['meets_criteria'] / 20_000
+    assert 0 < result['p_meets_criteria'] < 1
+
+
+@pytest.mark.parametrize('kwargs, error', [
+    ({'n_samples': 0}, ValueError),
+    ({'tolerances': {'height': 1.0}}, KeyError)
+])
+def test_invalid_arguments_raise(optimizer, candidate, kwargs, error):
+    with pytest.raises(error):
+        optimizer.tolerance_analysis(candidate, **kwargs)
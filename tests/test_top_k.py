@@ -0,0 +1,36 @@
+"""Streaming top-k search against a full sort of the sweep"""
+
+import numpy as np
+import pytest
+
+TOP_K_GRID = dict(a_range=(50, 75), b_range=(70, 150), n_a=12, n_b=15)
+
+
+def full_sort(chip, optimizer, k):
+    columns = optimizer.sweep_a_range(**TOP_K_GRID)
+    index = np.flatnonzero(columns['meets_criteria'])
+    index = index[np.argsort(columns['V_rf_required'][index], kind='stable')][:k]
+    return chip.columns_to_records({key: value[index] for key, value in columns.items()})
+
+
+@pytest.mark.parametrize('chunk_size', [1, 40, 4096])
+def test_streaming_top_k_matches_full_sort(chip, optimizer, chunk_size):
+    best, all_results = optimizer.stream_top_solutions(max_solutions=25, chunk_size=chunk_size, **TOP_K_GRID)
+
+    assert all_results is None
+    assert best == full_sort(chip, optimizer, 25)
+
+
+def test_streaming_keep_all_returns_every_point(optimizer):
+    best, all_results = optimizer.stream_top_solutions(max_solutions=5, chunk_size=40, keep_all=True, **TOP_K_GRID)
+
+    assert len(best) == 5
+    assert len(all_results) == len(optimizer.sweep_a_range(**TOP_K_GRID)['a_prime'])
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_non_positive_k_returns_nothing(optimizer, k):
+    assert optimizer.stream_top_solutions(max_solutions=k, **TOP_K_GRID) == ([], None)
+    best, _ = optimizer.find_all_feasible_solutions(a_range=TOP_K_GRID['a_range'], max_solutions=k,
+                                                    n_a=TOP_K_GRID['n_a'], n_b=TOP_K_GRID['n_b'])
+    assert best == []